@@ -0,0 +1,72 @@
+"""Per-request cost of get_current_user: remote lookup vs. local JWT verification vs. cache hit.
+
+The remote path is simulated with a fixed round-trip (--rtt-ms) standing in for
+supabase.auth.get_user; the local paths are measured for real.
+
+Usage (from backend/):
+    python benchmarks/bench_auth.py --requests 2000 --rtt-ms 40
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+os.environ["SUPABASE_JWT_SECRET"] = "benchmark-secret-benchmark-secret"
+
+from jose import jwt
+
+import database
+from routers import auth
+
+class _RemoteAuth:
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+
+    async def get_user(self, token):
+        await asyncio.sleep(self.rtt)
+        claims = jwt.get_unverified_claims(token)
+        return SimpleNamespace(user=SimpleNamespace(id=claims["sub"], email=claims.get("email")))
+
+def make_token(i: int) -> str:
+    claims = {"sub": f"user-{i}", "email": f"user{i}@example.com", "aud": "authenticated", "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, os.environ["SUPABASE_JWT_SECRET"], algorithm="HS256")
+
+async def measure(label: str, headers, n: int):
+    start = time.perf_counter()
+    for i in range(n):
+        await auth.get_current_user(headers[i % len(headers)])
+    per_request_us = (time.perf_counter() - start) / n * 1e6
+    print(f"{label:<28} {per_request_us:>10.1f} µs/request")
+
+async def run(n: int, rtt_ms: float):
+    database._supabase = SimpleNamespace(auth=_RemoteAuth(rtt_ms / 1000))
+    headers = [f"Bearer {make_token(i)}" for i in range(n)]
+
+    # Before: every request goes to the auth server
+    auth.SUPABASE_JWT_SECRET = None
+    auth._token_cache.ttl = 0
+    await measure("remote get_user (before)", headers, min(n, 50))
+
+    # Local verification, cache disabled: distinct tokens every request
+    auth.SUPABASE_JWT_SECRET = os.environ["SUPABASE_JWT_SECRET"]
+    await measure("local JWT verify", headers, n)
+
+    # Cache hits: the same token on repeat requests
+    auth._token_cache.ttl = 60
+    await auth.get_current_user(headers[0])
+    await measure("token cache hit", headers[:1], n)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.rtt_ms))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Exact vs. minibatch clustering engines: time and quality at several project sizes.
+
+Quality is the adjusted Rand index against the synthetic ground-truth topics,
+plus a silhouette score on a fixed 2,000-point sample so both engines are
+scored the same way. The exact engine is skipped above --exact-max because
+its full silhouette is O(n²).
+
+Usage (from backend/):
+    python benchmarks/bench_clustering_engines.py --sizes 1000,10000,50000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score, silhouette_score
+
+def synthetic_embeddings(n: int, n_topics: int, dim: int = 384):
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(n_topics, dim))
+    truth = rng.integers(0, n_topics, size=n)
+    return centers[truth] + 0.9 * rng.normal(size=(n, dim)), truth
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--topics", type=int, default=6)
+    parser.add_argument("--exact-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    from routers import clustering
+    import workers
+
+    print(f"{'papers':>7} {'engine':>10} {'seconds':>9} {'k':>3} {'ARI':>6} {'silhouette':>11}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        embeddings, truth = synthetic_embeddings(n, args.topics)
+        for engine in ("exact", "minibatch"):
+            if engine == "exact" and n > args.exact_max:
+                print(f"{n:>7} {engine:>10} {'skipped':>9}")
+                continue
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                k, labels = clustering.find_optimal_clusters(embeddings, engine=engine)
+            elapsed = time.perf_counter() - start
+            ari = adjusted_rand_score(truth, labels)
+            sil = silhouette_score(embeddings, labels, sample_size=min(2000, n), random_state=0) if k > 1 else float("nan")
+            print(f"{n:>7} {engine:>10} {elapsed:>9.2f} {k:>3} {ari:>6.3f} {sil:>11.3f}")
+    workers.shutdown_workers()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Throughput of the batched embedding pipeline against a local stub of the HF endpoint.
+
+The stub sleeps a fixed per-request latency plus a small per-input cost, which is
+roughly how the hosted feature-extraction endpoint behaves.
+
+Usage (from backend/):
+    python benchmarks/bench_embedding_batches.py --papers 200 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIM = 384
+
+def make_handler(latency: float, per_item: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        requests_served = 0
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            inputs = body["inputs"]
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            time.sleep(latency + per_item * len(inputs))
+            vectors = [[(hash(text) % 997) / 997.0] * DIM for text in inputs]
+            payload = json.dumps(vectors).encode()
+            StubHandler.requests_served += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--per-item", type=float, default=0.002, help="seconds per input")
+    parser.add_argument("--batch-sizes", default="1,4,8,16,32,64")
+    args = parser.parse_args()
+
+    handler = make_handler(args.latency, args.per_item)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["HF_API_URL"] = f"http://127.0.0.1:{server.server_port}/"
+    os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "embeddings.sqlite3")
+
+    import embeddings
+    import builtins
+    quiet_print = lambda *a, **k: None
+
+    print(f"{'batch':>6} {'requests':>9} {'seconds':>9} {'papers/s':>10}")
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        handler.requests_served = 0
+        # Fresh texts per round so the embedding cache doesn't serve them
+        texts = [f"Paper {i} (round {batch_size}): a study of topic {i % 17} with enough text to embed." for i in range(args.papers)]
+        original_print, builtins.print = builtins.print, quiet_print
+        try:
+            start = time.perf_counter()
+            out = asyncio.run(embeddings.generate_embeddings(texts, batch_size=batch_size))
+            elapsed = time.perf_counter() - start
+        finally:
+            builtins.print = original_print
+        assert all(v is not None and len(v) == DIM for v in out)
+        print(f"{batch_size:>6} {handler.requests_served:>9} {elapsed:>9.2f} {len(texts) / elapsed:>10.1f}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Embedding storage formats: size, decode time and effect on clustering.
+
+For each EMBEDDING_STORAGE format, reports the bytes per vector stored in
+Postgres and sent by PostgREST as JSON. It also times decoding a response of
+--papers rows into the matrix the clustering and graph code work on: JSON float
+arrays through np.array, as before, and packed rows through embedding_matrix.
+
+Quality compares clustering the decoded vectors with clustering the float64
+originals. It reports the cosine between each original and its decoded copy,
+recall of every paper's 10 nearest neighbours (the graph edges), and the
+adjusted Rand index (ARI) of find_optimal_clusters' labels against the float
+run and against the synthetic topics.
+
+Usage (from backend/):
+    python benchmarks/bench_embedding_storage.py --papers 2000 --topics 8
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+from embedding_storage import embedding_fields, embedding_matrix
+
+# Postgres FLOAT8[] header (varlena, ndim, flags, element type, dims, lower bound)
+FLOAT8_ARRAY_OVERHEAD = 24
+
+NOISE = 4.5
+
+def synthetic_embeddings(n: int, n_topics: int, noise: float, dim: int = 384):
+    """Unit vectors around random topic directions, like sentence-transformer
+    output: same-topic cosine about 1 / (1 + noise²), cross-topic ~0."""
+    rng = np.random.default_rng(0)
+    topics = np.arange(n) % n_topics
+    centers = rng.normal(size=(n_topics, dim))
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = centers[topics] + rng.normal(scale=noise / np.sqrt(dim), size=(n, dim))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True), topics
+
+def neighbours(matrix: np.ndarray, k: int = 10) -> np.ndarray:
+    unit = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    sims = unit @ unit.T
+    np.fill_diagonal(sims, -np.inf)
+    return np.argpartition(-sims, k - 1, axis=1)[:, :k]
+
+def cluster(clustering, matrix: np.ndarray) -> np.ndarray:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return np.asarray(clustering.find_optimal_clusters(matrix)[1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--topics", type=int, default=8)
+    parser.add_argument("--noise", type=float, default=NOISE, help="spread of papers around their topic")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    import workers
+    from routers import clustering
+
+    vectors, topics = synthetic_embeddings(args.papers, args.topics, args.noise)
+    dim = vectors.shape[1]
+    float_labels = cluster(clustering, vectors)
+    float_neighbours = neighbours(vectors)
+
+    print(f"{args.papers} papers, {dim}-d, {args.topics} topics; float64 clustering ARI vs topics "
+          f"{adjusted_rand_score(topics, float_labels):.3f}\n")
+    print(f"{'format':<8} {'stored B':>9} {'JSON B':>8} {'decode ms':>10} {'min cos':>8} "
+          f"{'10-NN recall':>13} {'ARI vs float':>13} {'ARI vs topics':>14}")
+    for storage in ("float", "float16", "int8"):
+        rows = [{"id": str(uuid.uuid4()), **embedding_fields(vector.tolist(), storage)} for vector in vectors]
+        column = "embedding" if storage == "float" else "embedding_packed"
+        # What PostgREST sends for select=id,<column>
+        body = json.dumps([{"id": row["id"], column: row[column]} for row in rows])
+        if storage == "float":
+            stored = FLOAT8_ARRAY_OVERHEAD + 8 * dim
+        else:
+            stored = 4 + len(rows[0][column])
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            data = json.loads(body)
+            if storage == "float":
+                matrix = np.array([row["embedding"] for row in data])
+            else:
+                matrix = embedding_matrix(data)
+        decode_ms = (time.perf_counter() - start) / args.rounds * 1000
+
+        cosines = np.sum(matrix * vectors, axis=1) / np.linalg.norm(matrix, axis=1)
+        recall = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(float_neighbours, neighbours(matrix))])
+        labels = float_labels if storage == "float" else cluster(clustering, matrix)
+        print(f"{storage:<8} {stored:>9} {len(body) / len(rows):>8.0f} {decode_ms:>10.1f} {cosines.min():>8.5f} "
+              f"{recall:>13.4f} {adjusted_rand_score(float_labels, labels):>13.4f} "
+              f"{adjusted_rand_score(topics, labels):>14.4f}")
+    workers.shutdown_workers()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Check that /health stays responsive while /api/cluster/{project_id} is running.
+
+Runs the real app in-process against an in-memory Supabase stand-in with
+pre-computed embeddings, so the clustering request is pure CPU work (TF-IDF,
+KMeans sweep, silhouette). A well-behaved event loop keeps /health latency flat:
+the run fails if the clustering request fails, or if /health p95 during clustering
+is over --max-slowdown times its idle p95 (and over --floor-ms, so sub-millisecond
+jitter doesn't count).
+
+Usage (from backend/):
+    python benchmarks/bench_health_during_cluster.py --papers 1500 --max-slowdown 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+os.environ.pop("GROQ_API_KEY", None)
+
+import httpx
+import numpy as np
+
+import database
+import main
+from routers import clustering
+from benchmarks.fake_supabase import FakeSupabase
+
+USER = SimpleNamespace(id="bench-user", email="bench@example.com")
+
+async def _fake_current_user(authorization: str = None):
+    return USER
+
+def seed(fake: FakeSupabase, n_papers: int) -> str:
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(6, 384))
+    project_id = "bench-project"
+    fake.store["projects"] = [{"id": project_id, "user_id": USER.id, "name": "bench"}]
+    fake.store["papers"] = []
+    for i in range(n_papers):
+        vec = centers[i % 6] + 0.3 * rng.normal(size=384)
+        fake.store["papers"].append({
+            "id": f"paper-{i}",
+            "project_id": project_id,
+            "title": f"Paper {i} on topic {i % 6}",
+            "abstract": f"An abstract about topic {i % 6} and subtopic {i % 13}.",
+            "embedding": vec.tolist(),
+            "cluster_id": None,
+            "created_at": f"2025-01-01T00:00:{i:06d}",
+        })
+    return project_id
+
+async def probe(client, stop: asyncio.Event, interval: float):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+def summarize(label, values):
+    values = sorted(values)
+    p95 = values[int(0.95 * (len(values) - 1))]
+    print(f"{label:<18} n={len(values):<5} p50={statistics.median(values):7.2f} ms  "
+          f"p95={p95:7.2f} ms  max={values[-1]:7.2f} ms")
+    return p95
+
+async def run(n_papers: int, interval: float, max_slowdown: float, floor_ms: float):
+    fake = FakeSupabase()
+    database._supabase = fake
+    clustering.get_current_user = _fake_current_user
+    project_id = seed(fake, n_papers)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        baseline_task = asyncio.create_task(probe(client, stop, interval))
+        await asyncio.sleep(1.0)
+        stop.set()
+        baseline = await baseline_task
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop, interval))
+        start = time.perf_counter()
+        response = await client.post(f"/api/cluster/{project_id}", timeout=None)
+        cluster_seconds = time.perf_counter() - start
+        stop.set()
+        during = await probe_task
+
+    print(f"cluster request: {response.status_code} in {cluster_seconds:.2f} s "
+          f"({response.json().get('n_clusters')} clusters, {n_papers} papers)")
+    idle_p95 = summarize("/health idle", baseline)
+    during_p95 = summarize("/health during", during)
+    
+    if response.status_code != 200:
+        print(f"✗ cluster request failed: {response.text}")
+        sys.exit(1)
+    limit = max(max_slowdown * idle_p95, floor_ms)
+    if during_p95 > limit:
+        print(f"✗ /health p95 during clustering is {during_p95:.2f} ms, over the {limit:.2f} ms limit")
+        sys.exit(1)
+    print(f"✓ /health p95 during clustering is {during_p95 / idle_p95:.1f}x idle (limit {limit:.2f} ms)")
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=1500)
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--max-slowdown", type=float, default=10.0)
+    parser.add_argument("--floor-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.papers, args.interval, args.max_slowdown, args.floor_ms))
+
+if __name__ == "__main__":
+    main_cli()
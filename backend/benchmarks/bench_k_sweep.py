@@ -0,0 +1,58 @@
+"""Serial vs. process-pool KMeans k-sweep in find_optimal_clusters.
+
+Checks that both paths pick the same k and labels, and reports wall-clock time.
+
+Usage (from backend/):
+    python benchmarks/bench_k_sweep.py --papers 2000 --workers 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+
+import numpy as np
+
+def synthetic_embeddings(n: int, n_topics: int = 6, dim: int = 384) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(n_topics, dim))
+    return centers[np.arange(n) % n_topics] + 0.8 * rng.normal(size=(n, dim))
+
+def timed_sweep(clustering, embeddings):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        k, labels = clustering.find_optimal_clusters(embeddings)
+    return k, labels, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    import clustering_engine
+    import workers
+    from routers import clustering
+
+    embeddings = synthetic_embeddings(args.papers)
+
+    workers.PROCESS_WORKERS = clustering_engine.PROCESS_WORKERS = 1
+    k_serial, labels_serial, t_serial = timed_sweep(clustering, embeddings)
+
+    workers.PROCESS_WORKERS = clustering_engine.PROCESS_WORKERS = args.workers
+    timed_sweep(clustering, embeddings[:clustering_engine.SWEEP_PARALLEL_MIN_SAMPLES])  # warm up the pool
+    k_parallel, labels_parallel, t_parallel = timed_sweep(clustering, embeddings)
+    workers.shutdown_workers()
+
+    print(f"papers={args.papers} workers={args.workers}")
+    print(f"serial:   k={k_serial} in {t_serial:.2f} s")
+    print(f"parallel: k={k_parallel} in {t_parallel:.2f} s  ({t_serial / t_parallel:.1f}x)")
+    print(f"identical result: {k_serial == k_parallel and np.array_equal(labels_serial, labels_parallel)}")
+
+if __name__ == "__main__":
+    main()
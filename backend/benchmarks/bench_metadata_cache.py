@@ -0,0 +1,105 @@
+"""Bulk import against the metadata cache: cold (upstream) vs. warm (local) lookups.
+
+Upstream arXiv and Semantic Scholar are replaced by an httpx mock transport that
+sleeps --rtt-ms per request. A cold import records every response in a temporary
+cache; the same list is then imported into a second project, first normally and
+then with METADATA_CACHE_OFFLINE set, which never touches the network, so the
+importer can be run against a recorded cache file.
+
+Usage (from backend/):
+    python benchmarks/bench_metadata_cache.py --items 300 --rtt-ms 300
+"""
+import argparse
+import asyncio
+import builtins
+import json
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+os.environ["METADATA_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "metadata.sqlite3")
+os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "embeddings.sqlite3")
+
+import httpx
+
+import database
+import http_clients
+from benchmarks.fake_supabase import FakeSupabase
+from routers import papers
+
+def make_transport(rtt: float, counter: dict):
+    async def handler(request: httpx.Request):
+        counter["requests"] += 1
+        await asyncio.sleep(rtt)
+        if request.url.host == "export.arxiv.org":
+            ids = request.url.params["id_list"].split(",")
+            entries = "".join(
+                f"<entry><id>http://arxiv.org/abs/{i}v1</id><title>arXiv paper {i}</title>"
+                f"<summary>Abstract of {i}.</summary><published>2023-01-01T00:00:00Z</published>"
+                f"<author><name>Author {i}</name></author></entry>"
+                for i in ids if not i.endswith("9")  # ids ending in 9 don't exist
+            )
+            return httpx.Response(200, text=f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>')
+        ids = json.loads(request.content)["ids"]
+        return httpx.Response(200, json=[
+            None if i.endswith("9") else {"title": f"Paper {i}", "abstract": "An abstract.", "authors": [{"name": "A. Author"}], "year": 2022}
+            for i in ids
+        ])
+    return httpx.MockTransport(handler)
+
+async def run_import(project_id: str, items):
+    request = papers.BulkImportRequest(project_id=project_id, items=items)
+    start = time.perf_counter()
+    original_print, builtins.print = builtins.print, lambda *a, **k: None
+    try:
+        result = await papers.import_papers(request, "Bearer benchmark")
+    finally:
+        builtins.print = original_print
+    return result, time.perf_counter() - start
+
+async def run(n_items: int, rtt_ms: float):
+    counter = {"requests": 0}
+    transport = make_transport(rtt_ms / 1000, counter)
+    real_client = httpx.AsyncClient
+    http_clients.httpx.AsyncClient = lambda **kwargs: real_client(transport=transport, **kwargs)
+
+    fake = FakeSupabase(latency=0.002)
+    fake.store["projects"] = [{"id": "p1", "user_id": "u"}, {"id": "p2", "user_id": "u"}, {"id": "p3", "user_id": "u"}]
+    database._supabase = fake
+
+    async def current_user(authorization):
+        return SimpleNamespace(id="u", email="bench@example.com")
+    papers.get_current_user = current_user
+
+    items = [f"2301.{i:05d}" if i % 2 else f"10.1000/bench.{i}" for i in range(n_items)]
+
+    print(f"{'run':<22} {'upstream calls':>15} {'seconds':>9} {'imported':>9} {'not found':>10}")
+    for label, project_id, offline in (("cold", "p1", False), ("warm", "p2", False), ("warm, offline", "p3", True)):
+        papers.METADATA_CACHE_OFFLINE = offline
+        counter["requests"] = 0
+        result, elapsed = await run_import(project_id, items)
+        not_found = sum(r["status"] == "not_found" for r in result["results"])
+        print(f"{label:<22} {counter['requests']:>15} {elapsed:>9.3f} {result['imported']:>9} {not_found:>10}")
+
+    ids = [i for i in items if i.startswith("10.")]
+    start = time.perf_counter()
+    rounds = 20
+    for _ in range(rounds):
+        papers.get_cached_metadata("semantic_scholar", ids)
+    per_lookup_us = (time.perf_counter() - start) / (rounds * len(ids)) * 1e6
+    print(f"\ncached lookup: {per_lookup_us:.1f} µs/id ({papers.get_metadata_cache().stats()})")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--rtt-ms", type=float, default=300, help="simulated upstream round-trip per request")
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.rtt_ms))
+
+if __name__ == "__main__":
+    main()
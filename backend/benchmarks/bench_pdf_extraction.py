@@ -0,0 +1,104 @@
+"""PDF title/abstract extraction per backend: pages parsed, ms per PDF and accuracy.
+
+Runs every installed backend twice, reading pages lazily with early exit and
+parsing both pages up front (the old behaviour), over either a directory of PDFs
+or a synthetic corpus with known abstracts.
+
+Accuracy is measured against <name>.abstract.txt next to each PDF when present
+(the synthetic corpus always has it). Without ground truth, it is agreement with
+PyPDF2 parsing both pages, i.e. the extractor as it was.
+
+Usage (from backend/):
+    python benchmarks/bench_pdf_extraction.py --synthetic 200
+    python benchmarks/bench_pdf_extraction.py --pdf-dir ~/papers
+"""
+import argparse
+import builtins
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_text
+from benchmarks.sample_pdfs import make_paper
+
+def load_corpus(pdf_dir: str):
+    corpus = []
+    for name in sorted(os.listdir(pdf_dir)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(pdf_dir, name)
+        with open(path, "rb") as f:
+            content = f.read()
+        truth_path = os.path.splitext(path)[0] + ".abstract.txt"
+        truth = open(truth_path).read() if os.path.exists(truth_path) else None
+        corpus.append((name, content, truth))
+    return corpus
+
+def synthetic_corpus(n: int):
+    # Every fifth paper has an abstract long enough to continue on page 2
+    corpus = []
+    for i in range(n):
+        content, _, abstract = make_paper(i, abstract_sentences=40 if i % 5 == 0 else 6)
+        corpus.append((f"synthetic-{i}.pdf", content, abstract))
+    return corpus
+
+def tokens(text):
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+def token_f1(predicted, reference) -> float:
+    predicted, reference = tokens(predicted), tokens(reference)
+    if not predicted or not reference:
+        return float(predicted == reference)
+    common = 0
+    remaining = list(reference)
+    for token in predicted:
+        if token in remaining:
+            remaining.remove(token)
+            common += 1
+    if common == 0:
+        return 0.0
+    precision, recall = common / len(predicted), common / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+def run(corpus, backend: str, early_exit: bool):
+    results, pages, elapsed = [], 0, 0.0
+    original_print, builtins.print = builtins.print, lambda *a, **k: None
+    try:
+        for _, content, _ in corpus:
+            start = time.perf_counter()
+            result = pdf_text.extract_text_from_pdf(content, backend=backend, early_exit=early_exit)
+            elapsed += time.perf_counter() - start
+            pages += result["pages_parsed"]
+            results.append(result)
+    finally:
+        builtins.print = original_print
+    return results, pages, elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf-dir", help="directory of PDFs (optionally with <name>.abstract.txt)")
+    parser.add_argument("--synthetic", type=int, default=100, help="synthetic papers when no --pdf-dir")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.pdf_dir) if args.pdf_dir else synthetic_corpus(args.synthetic)
+    has_truth = all(truth is not None for _, _, truth in corpus)
+    reference, _, _ = run(corpus, "pypdf2", early_exit=False)
+    references = [truth for _, _, truth in corpus] if has_truth else [r["abstract"] for r in reference]
+
+    print(f"{len(corpus)} PDFs, accuracy vs. {'ground truth' if has_truth else 'PyPDF2 full parse'}")
+    print(f"{'backend':<9} {'mode':<11} {'pages/pdf':>9} {'ms/pdf':>8} {'found':>6} {'token F1':>9} {'same as ref':>12}")
+    for backend in pdf_text.available_pdf_backends():
+        for early_exit in (False, True):
+            results, pages, elapsed = run(corpus, backend, early_exit)
+            found = sum(1 for r in results if r["abstract"])
+            f1 = sum(token_f1(r["abstract"], ref) for r, ref in zip(results, references)) / len(corpus)
+            same = sum(1 for r, ref in zip(results, reference) if (r["title"], r["abstract"]) == (ref["title"], ref["abstract"]))
+            mode = "early exit" if early_exit else "both pages"
+            print(f"{backend:<9} {mode:<11} {pages / len(corpus):>9.2f} {elapsed / len(corpus) * 1000:>8.2f} "
+                  f"{found:>6} {f1:>9.3f} {same:>12}")
+
+if __name__ == "__main__":
+    main()
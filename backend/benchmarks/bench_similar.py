@@ -0,0 +1,102 @@
+"""Similar-papers search: exact index and (if hnswlib is installed) HNSW.
+
+For each project size, builds the index over synthetic embeddings and times one
+/similar search against the brute-force way of answering it: decode every
+embedding, take cosine similarities to the paper and sort them all. The exact
+index must return the same papers, in the same order, as brute force. It does
+the same after a round of incremental updates (re-embedded, added and deleted
+papers), compared against an index rebuilt from scratch.
+
+HNSW reports recall@k against the exact results.
+
+Usage (from backend/):
+    python benchmarks/bench_similar.py --sizes 1000,10000,50000 --k 10
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from embedding_storage import embedding_fields, embedding_matrix
+from vector_index import ExactIndex, HnswIndex, hnsw_available
+from benchmarks.bench_embedding_storage import synthetic_embeddings
+
+def brute_force(papers, paper_id, k):
+    matrix = embedding_matrix(papers)
+    unit = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    row = next(i for i, paper in enumerate(papers) if paper['id'] == paper_id)
+    scores = unit @ unit[row]
+    order = [i for i in np.argsort(-scores, kind="stable") if i != row][:k]
+    return [papers[i]['id'] for i in order]
+
+def timed(fn, *args, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / rounds * 1000
+
+def build(index, papers):
+    index.add([paper['id'] for paper in papers], embedding_matrix(papers))
+    return index
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--storage", default="float16", choices=["float", "float16", "int8"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    print(f"{'papers':>7} {'build ms':>9} {'exact ms':>9} {'brute ms':>9} {'same':>5} "
+          f"{'updated same':>13} {'hnsw build ms':>14} {'hnsw ms':>8} {'recall':>7}")
+    for n in [int(size) for size in args.sizes.split(",")]:
+        vectors, _ = synthetic_embeddings(n, 20, 4.5)
+        papers = [{"id": f"paper-{i}", **embedding_fields(vector.tolist(), args.storage)}
+                  for i, vector in enumerate(vectors)]
+        queries = [papers[i]['id'] for i in rng.choice(n, size=min(args.queries, n), replace=False)]
+
+        start = time.perf_counter()
+        index = build(ExactIndex(), papers)
+        build_ms = (time.perf_counter() - start) * 1000
+        exact = {q: [pid for pid, _ in index.search(q, args.k)] for q in queries}
+        same = all(exact[q] == brute_force(papers, q, args.k) for q in queries[:5])
+        _, exact_ms = timed(index.search, queries[0], args.k)
+        _, brute_ms = timed(brute_force, papers, queries[0], args.k, rounds=3)
+
+        # Re-embed a tenth, add a tenth more, delete a tenth, then compare with a fresh build
+        changed = [{"id": papers[i]['id'], **embedding_fields(rng.normal(size=vectors.shape[1]).tolist(), args.storage)}
+                   for i in rng.choice(n, size=n // 10, replace=False)]
+        added = [{"id": f"new-{i}", **embedding_fields(rng.normal(size=vectors.shape[1]).tolist(), args.storage)}
+                 for i in range(n // 10)]
+        deleted = {papers[i]['id'] for i in rng.choice(n, size=n // 10, replace=False)}
+        build(index, changed)
+        build(index, added)
+        index.remove(sorted(deleted))
+        by_id = {paper['id']: paper for paper in papers + added}
+        by_id.update((paper['id'], paper) for paper in changed)
+        current = [paper for pid, paper in by_id.items() if pid not in deleted]
+        fresh = build(ExactIndex(), current)
+        live = [q for q in queries if q not in deleted]
+        updated_same = len(index) == len(current) and all(
+            [pid for pid, _ in index.search(q, args.k)] == [pid for pid, _ in fresh.search(q, args.k)] for q in live
+        )
+
+        hnsw_cols = f"{'-':>14} {'-':>8} {'-':>7}"
+        if hnsw_available():
+            start = time.perf_counter()
+            hnsw = build(HnswIndex(vectors.shape[1], n), papers)
+            hnsw_build_ms = (time.perf_counter() - start) * 1000
+            recall = np.mean([len(set(exact[q]) & {pid for pid, _ in hnsw.search(q, args.k)}) / args.k for q in queries])
+            _, hnsw_ms = timed(hnsw.search, queries[0], args.k)
+            hnsw_cols = f"{hnsw_build_ms:>14.0f} {hnsw_ms:>8.3f} {recall:>7.3f}"
+
+        print(f"{n:>7} {build_ms:>9.1f} {exact_ms:>9.3f} {brute_ms:>9.1f} {str(same):>5} "
+              f"{str(updated_same):>13} {hnsw_cols}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Minimal in-memory stand-in for the async Supabase client, for benchmarks only.
+
+Supports the query-builder subset the routers use: select/insert/update/upsert/
+delete with eq/in_/or_/order/limit, followed by `await ... .execute()`.
+"""
+import asyncio
+import re
+import uuid
+from types import SimpleNamespace
+
+# Primary key per table where it isn't "id"
+PRIMARY_KEYS = {"cluster_models": "project_id"}
+
+def _like_regex(pattern: str) -> str:
+    """SQL LIKE pattern (PostgREST also takes * for %) as a regex."""
+    wildcards = {"*": ".*", "%": ".*", "_": "."}
+    return "".join(wildcards.get(c, re.escape(c)) for c in pattern)
+
+class _Query:
+    def __init__(self, store, table, latency):
+        self._rows = store.setdefault(table, [])
+        self._key = PRIMARY_KEYS.get(table, "id")
+        self._latency = latency
+        self._op = "select"
+        self._payload = None
+        self._filters = []
+        self._order = None
+        self._limit = None
+
+    def select(self, *columns, **kwargs):
+        self._op = "select"
+        return self
+
+    def insert(self, payload):
+        self._op, self._payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self._op, self._payload = "update", payload
+        return self
+
+    def upsert(self, payload, on_conflict=None, **kwargs):
+        self._op, self._payload = "upsert", payload
+        if on_conflict:
+            self._key = tuple(on_conflict.split(","))
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self._filters.append(lambda r: r.get(column) in values)
+        return self
+
+    def or_(self, filters):
+        """Only the `column.like."pattern"` / `column.ilike."pattern"` terms the
+        import lookup builds; a row matches if any term does."""
+        terms = re.findall(r'(\w+)\.(like|ilike)\."((?:[^"\\]|\\.)*)"', filters)
+        patterns = [(column, re.compile(_like_regex(re.sub(r'\\(.)', r'\1', value)),
+                                        re.IGNORECASE if op == "ilike" else 0))
+                    for column, op, value in terms]
+        self._filters.append(lambda r: any(
+            r.get(column) is not None and pattern.fullmatch(r.get(column)) for column, pattern in patterns
+        ))
+        return self
+
+    def is_(self, column, value):
+        self._filters.append(lambda r: r.get(column) is None)
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def _matching(self):
+        return [r for r in self._rows if all(f(r) for f in self._filters)]
+
+    async def execute(self):
+        await asyncio.sleep(self._latency)
+        if self._op == "select":
+            data = [dict(r) for r in self._matching()]
+            if self._order:
+                column, desc = self._order
+                data.sort(key=lambda r: (r.get(column) is not None, r.get(column)), reverse=desc)
+            if self._limit is not None:
+                data = data[:self._limit]
+        elif self._op == "insert":
+            rows = self._payload if isinstance(self._payload, list) else [self._payload]
+            data = []
+            for row in rows:
+                row = {"id": str(uuid.uuid4()), **row}
+                self._rows.append(row)
+                data.append(dict(row))
+        elif self._op == "upsert":
+            rows = self._payload if isinstance(self._payload, list) else [self._payload]
+            columns = self._key if isinstance(self._key, tuple) else (self._key,)
+            key_of = lambda r: tuple(r.get(c) for c in columns)
+            by_key = {key_of(r): r for r in self._rows}
+            data = []
+            for row in rows:
+                if key_of(row) in by_key:
+                    by_key[key_of(row)].update(row)
+                else:
+                    self._rows.append({"id": str(uuid.uuid4()), **row})
+                data.append(dict(row))
+        elif self._op == "update":
+            data = []
+            for r in self._matching():
+                r.update(self._payload)
+                data.append(dict(r))
+        else:
+            data = [dict(r) for r in self._matching()]
+            self._rows[:] = [r for r in self._rows if r not in self._matching()]
+        return SimpleNamespace(data=data)
+
+class FakeSupabase:
+    def __init__(self, latency: float = 0.002):
+        self.store = {}
+        self.latency = latency
+
+    def table(self, name):
+        return _Query(self.store, name, self.latency)
@@ -0,0 +1,180 @@
+"""The title/abstract text cleaners exactly as they were before the precompiled
+pipeline in pdf_text.py, kept as the reference for the golden fixtures and as the
+baseline in bench_text_cleaning.py. Do not edit."""
+import re
+
+def clean_abstract_text(text: str) -> str:
+    """Thoroughly clean up extracted abstract text."""
+    import re
+    
+    if not text:
+        return ""
+    
+    # Remove arXiv identifiers and dates
+    text = re.sub(r'arXiv:[^\s]+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}', '', text, flags=re.IGNORECASE)
+    
+    # Remove email addresses
+    text = re.sub(r'[\w\.-]+@[\w\.-]+\.\w+', '', text)
+    
+    # Remove section markers like "§"
+    text = re.sub(r'§[^\s]*', '', text)
+    
+    # Remove "Contents" section and everything after
+    contents_match = re.search(r'\bcontents\b', text, re.IGNORECASE)
+    if contents_match:
+        text = text[:contents_match.start()]
+    
+    # Remove numbered sections like "1 Introduction", "2.1 Methods"
+    text = re.sub(r'\n\s*\d+\.?\d*\s+[A-Z][a-z]+.*', '', text)
+    
+    # Remove page numbers
+    text = re.sub(r'\b\d+\s*$', '', text, flags=re.MULTILINE)
+    
+    # Remove institution/address lines (contain "University", "Institut", postal codes)
+    lines = text.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        line_stripped = line.strip()
+        # Skip lines that look like addresses or affiliations
+        if re.search(r'(University|Institut|Department|Postfach|D-\d{5}|\d{5}\s+[A-Z])', line_stripped, re.IGNORECASE):
+            continue
+        # Skip lines that are just author names (short, title case, possibly with commas)
+        if len(line_stripped) < 50 and re.match(r'^[A-Z][a-z]+(\s+[A-Z]\.?\s*)*[A-Z][a-z]+\s*,?$', line_stripped):
+            continue
+        # Skip lines with "correspondence" or "address"
+        if re.search(r'(correspondence|address|email)', line_stripped, re.IGNORECASE):
+            continue
+        cleaned_lines.append(line)
+    text = '\n'.join(cleaned_lines)
+    
+    # Fix hyphenated words split across lines (e.g., "inter-\nest" -> "interest")
+    text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', text)
+    
+    # Fix spacing issues from PDF extraction
+    # Remove single character followed by space that's likely a broken word
+    text = re.sub(r'\b([a-z])\s+([a-z]{1,2})\s+([a-z])', r'\1\2\3', text)
+    
+    # Normalize whitespace
+    text = re.sub(r'\s+', ' ', text)
+    
+    # Remove any remaining "Abstract." or "Abstract:" at the start
+    text = re.sub(r'^abstract[\s.:]+', '', text, flags=re.IGNORECASE)
+    
+    # Trim and clean up
+    text = text.strip()
+    
+    # Remove trailing incomplete sentences (end mid-word or with weird chars)
+    if text and not text[-1] in '.!?"\'':
+        # Find last complete sentence
+        last_period = text.rfind('.')
+        if last_period > len(text) * 0.5:  # Only trim if we're keeping most of it
+            text = text[:last_period + 1]
+    
+    return text
+
+def extract_abstract_from_text(text: str) -> str:
+    """Extract ONLY the abstract section from paper text."""
+    import re
+    
+    if not text:
+        return None
+    
+    # Find where "Abstract" starts
+    abstract_match = re.search(r'\babstract\b[\s.:]*', text, re.IGNORECASE)
+    
+    if not abstract_match:
+        return None
+    
+    # Start right after "Abstract"
+    start_pos = abstract_match.end()
+    
+    # Find where abstract ends - look for common section headers
+    remaining_text = text[start_pos:]
+    
+    end_markers = [
+        r'\b(introduction|keywords|key\s*words|contents|1\s+introduction|1\.\s*introduction|i\.\s*introduction)\b',
+        r'\n\s*\d+\s*\n',  # Page numbers
+        r'\bCONTENTS\b',
+        r'\n\s*1\s+[A-Z]',  # Section 1 starting
+    ]
+    
+    end_pos = len(remaining_text)
+    for marker in end_markers:
+        match = re.search(marker, remaining_text, re.IGNORECASE)
+        if match and match.start() < end_pos:
+            end_pos = match.start()
+    
+    abstract = remaining_text[:end_pos]
+    
+    # Clean it up
+    abstract = clean_abstract_text(abstract)
+    
+    # If abstract is too short, it probably failed
+    if len(abstract) < 100:
+        return None
+    
+    # If abstract is too long, truncate at a sentence boundary
+    if len(abstract) > 2000:
+        # Find a good breaking point
+        truncated = abstract[:2000]
+        last_period = truncated.rfind('.')
+        if last_period > 1000:
+            abstract = truncated[:last_period + 1]
+        else:
+            abstract = truncated
+    
+    return abstract
+
+def extract_title_from_text(text: str) -> str:
+    """Extract the paper title from the text."""
+    import re
+    
+    if not text:
+        return None
+    
+    lines = text.strip().split('\n')
+    
+    for line in lines[:15]:  # Check first 15 lines
+        line = line.strip()
+        
+        # Skip empty lines
+        if not line:
+            continue
+        
+        # Skip arXiv identifiers
+        if re.match(r'^arXiv:', line, re.IGNORECASE):
+            continue
+        
+        # Skip dates
+        if re.match(r'^\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)', line, re.IGNORECASE):
+            continue
+        
+        # Skip lines with email
+        if '@' in line:
+            continue
+        
+        # Skip very short lines
+        if len(line) < 10:
+            continue
+        
+        # Skip lines that look like author names (short, mostly proper nouns)
+        if len(line) < 40 and re.match(r'^[A-Z][a-z]+\s+[A-Z]', line):
+            words = line.split()
+            if len(words) <= 4:
+                continue
+        
+        # Skip institution lines
+        if re.search(r'(University|Institut|Department)', line, re.IGNORECASE):
+            continue
+        
+        # Skip lines starting with section markers
+        if line.startswith('§'):
+            continue
+        
+        # This looks like a title!
+        # Clean it up
+        title = re.sub(r'\s+', ' ', line).strip()
+        return title
+    
+    return None
@@ -0,0 +1,93 @@
+"""Tiny dependency-free PDF writer for synthetic paper corpora used by the benchmarks.
+
+Each generated paper has a title, authors, an affiliation line, an "Abstract"
+section and an introduction, laid out over a few pages of Helvetica text, so the
+extractors see the same kind of first page a real paper has.
+"""
+import random
+from typing import List, Tuple
+
+WORDS = (
+    "graph neural network model training data learning representation method approach "
+    "results performance benchmark accuracy robust efficient scalable framework analysis "
+    "language vision protein climate energy quantum optimization inference sampling "
+    "attention transformer embedding retrieval clustering evaluation dataset signal"
+).split()
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Build a PDF with one text line per entry on each page."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    content_ids = []
+    for lines in pages:
+        ops = ["BT /F1 10 Tf 13 TL 60 750 Td"]
+        for line in lines:
+            line = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({line}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode()
+        content_ids.append(add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+
+    pages_id = len(objects) + len(pages) + 1
+    page_ids = [
+        add(f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] /Contents {cid} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>".encode())
+        for cid in content_ids
+    ]
+    kids = " ".join(f"{p} 0 R" for p in page_ids)
+    add(f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+    catalog = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 16))]
+    return " ".join(words).capitalize() + "."
+
+def _wrap(text: str, width: int = 90) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    if line:
+        lines.append(line)
+    return lines
+
+def make_paper(seed: int, n_pages: int = 4, abstract_sentences: int = 6) -> Tuple[bytes, str, str]:
+    """A synthetic paper PDF. Returns (pdf bytes, title, abstract)."""
+    rng = random.Random(seed)
+    title = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(5, 9))) + f" Study {seed}"
+    abstract = " ".join(_sentence(rng) for _ in range(abstract_sentences))
+
+    lines = [
+        title,
+        "Alice Smith, Bob Jones",
+        "Department of Computer Science, Example University",
+        "",
+        "Abstract",
+        *_wrap(abstract),
+        "",
+        "1 Introduction",
+    ]
+    # Body text flows over the remaining pages; a long abstract spills onto page 2
+    lines += _wrap(" ".join(_sentence(rng) for _ in range(45 * n_pages)))
+    lines_per_page = 55
+    pages = [lines[i:i + lines_per_page] for i in range(0, lines_per_page * n_pages, lines_per_page)]
+    return make_pdf(pages), title, abstract
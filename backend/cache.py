@@ -0,0 +1,150 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+class TTLCache:
+    """In-memory mapping with per-entry expiry and size-bounded LRU eviction."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+class SQLiteLRUCache:
+    """Persistent key/value cache in a SQLite file with size-bounded LRU eviction.
+
+    Entries may carry a TTL; expired entries read as misses and are evicted first.
+    Safe to share between threads. Keeps hit/miss counters for the process.
+    """
+
+    def __init__(self, path: str, max_entries: int, table: str = "cache"):
+        self.path = path
+        self.max_entries = max_entries
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL, expires_at REAL)"
+        )
+        # Cache files created before entries had a TTL
+        columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+        if "expires_at" not in columns:
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN expires_at REAL")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table}(last_used)")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_expires_at ON {table}(expires_at)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        found = {}
+        now = time.time()
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)", chunk + [now]
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self.set_many([(key, value)], ttl=ttl)
+
+    def set_many(self, items: List[Tuple[str, bytes]], ttl: Optional[float] = None):
+        """Store entries; with a ttl (seconds) they expire, otherwise they live until evicted."""
+        if not items:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, last_used, expires_at) VALUES (?, ?, ?, ?)",
+                [(key, value, now, expires_at) for key, value in items],
+            )
+            self._evict()
+
+    def _evict(self):
+        self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
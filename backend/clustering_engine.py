@@ -0,0 +1,113 @@
+import os
+from concurrent.futures import as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+
+from workers import PROCESS_WORKERS, get_process_pool
+
+# Below this many samples a k-sweep is faster serially than across processes
+SWEEP_PARALLEL_MIN_SAMPLES = int(os.getenv("SWEEP_PARALLEL_MIN_SAMPLES", "200"))
+
+# Projects with more papers than this use the "minibatch" engine: MiniBatchKMeans
+# and a silhouette score estimated on a random sample instead of all O(n²) pairs
+LARGE_PROJECT_THRESHOLD = int(os.getenv("LARGE_PROJECT_THRESHOLD", "3000"))
+SILHOUETTE_SAMPLE_SIZE = int(os.getenv("SILHOUETTE_SAMPLE_SIZE", "3000"))
+MINIBATCH_SIZE = int(os.getenv("MINIBATCH_SIZE", "2048"))
+
+SweepResult = Tuple[Optional[np.ndarray], Optional[float], Optional[str]]
+
+def select_engine(n_samples: int) -> str:
+    return "minibatch" if n_samples > LARGE_PROJECT_THRESHOLD else "exact"
+
+def fit_and_score_k(embeddings: np.ndarray, k: int, n_init: int, max_iter: int, engine: str = "exact"):
+    """Fit KMeans for one k and return (labels, silhouette score)."""
+    if engine == "minibatch":
+        kmeans = MiniBatchKMeans(
+            n_clusters=k, random_state=42, n_init=3, max_iter=max_iter, batch_size=MINIBATCH_SIZE
+        )
+        labels = kmeans.fit_predict(embeddings)
+        sample_size = min(SILHOUETTE_SAMPLE_SIZE, len(embeddings))
+        return labels, float(silhouette_score(embeddings, labels, sample_size=sample_size, random_state=42))
+
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=n_init, max_iter=max_iter)
+    labels = kmeans.fit_predict(embeddings)
+    return labels, float(silhouette_score(embeddings, labels))
+
+def mean_pairwise_cosine(embeddings: np.ndarray) -> float:
+    """Average cosine similarity over all distinct pairs in O(n·d), without the n×n matrix.
+
+    With unit rows u_i, sum_ij u_i·u_j = |sum_i u_i|². Like the dense version,
+    this subtracts n for the diagonal.
+    """
+    n_samples = len(embeddings)
+    if n_samples < 2:
+        return 1.0
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    unit = np.divide(embeddings, norms, out=np.zeros_like(embeddings, dtype=float), where=norms > 0)
+    total = float(np.square(unit.sum(axis=0)).sum())
+    return (total - n_samples) / (n_samples * (n_samples - 1))
+
+def _fit_and_score_shared(shm_name: str, shape, dtype, k: int, n_init: int, max_iter: int, engine: str):
+    """Process-pool task: attach to the shared embedding matrix and score one k."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        embeddings = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        try:
+            # One BLAS/OpenMP thread per process; the pool provides the parallelism
+            with threadpool_limits(1):
+                labels, score = fit_and_score_k(embeddings, k, n_init, max_iter, engine)
+            return k, labels, score, None
+        except Exception as e:
+            return k, None, None, str(e)
+        finally:
+            del embeddings
+    finally:
+        shm.close()
+
+def sweep_k(embeddings: np.ndarray, ks: Iterable[int], n_init: int, max_iter: int = 300, engine: str = "exact",
+            on_k_done: Optional[Callable[[int], None]] = None) -> Dict[int, SweepResult]:
+    """Fit and score every k. Returns {k: (labels, score, error)}.
+
+    Large inputs fan out across the process pool with the matrix in shared
+    memory; each fit keeps random_state=42, so results match the serial sweep.
+    `on_k_done(k)` is called as each fit finishes, in completion order.
+    """
+    ks = list(ks)
+    results: Dict[int, SweepResult] = {}
+
+    if PROCESS_WORKERS <= 1 or len(ks) <= 1 or len(embeddings) < SWEEP_PARALLEL_MIN_SAMPLES:
+        for k in ks:
+            try:
+                labels, score = fit_and_score_k(embeddings, k, n_init, max_iter, engine)
+                results[k] = (labels, score, None)
+            except Exception as e:
+                results[k] = (None, None, str(e))
+            if on_k_done:
+                on_k_done(k)
+        return results
+
+    matrix = np.ascontiguousarray(embeddings)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, matrix.nbytes))
+    try:
+        shared = np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=shm.buf)
+        shared[:] = matrix
+        del shared
+        pool = get_process_pool()
+        futures = [
+            pool.submit(_fit_and_score_shared, shm.name, matrix.shape, matrix.dtype, k, n_init, max_iter, engine)
+            for k in ks
+        ]
+        for future in as_completed(futures):
+            k, labels, score, error = future.result()
+            results[k] = (labels, score, error)
+            if on_k_done:
+                on_k_done(k)
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
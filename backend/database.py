@@ -1,5 +1,7 @@
 import os
-from supabase import create_client, Client
+import asyncio
+from typing import Optional
+from supabase import acreate_client, AsyncClient
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,8 +9,14 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-
-def get_supabase() -> Client:
-    return supabase
+_supabase: Optional[AsyncClient] = None
+_supabase_lock = asyncio.Lock()
 
+async def get_supabase() -> AsyncClient:
+    """Return the shared async Supabase client, creating it on first use."""
+    global _supabase
+    if _supabase is None:
+        async with _supabase_lock:
+            if _supabase is None:
+                _supabase = await acreate_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    return _supabase
@@ -0,0 +1,242 @@
+import os
+import re
+import asyncio
+import hashlib
+import threading
+from collections import Counter
+from typing import Callable, List, Optional
+
+import numpy as np
+import httpx
+from fastapi.concurrency import run_in_threadpool
+
+from cache import SQLiteLRUCache
+from http_clients import http_client
+from workers import run_cpu_bound
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+HF_API_URL = os.getenv(
+    "HF_API_URL",
+    f"https://api-inference.huggingface.co/pipeline/feature-extraction/{EMBEDDING_MODEL}",
+)
+
+# Number of texts sent to the embedding backend per call
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+# "hf_api" (hosted inference API) or "local" (in-process sentence-transformers on CPU)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hf_api")
+# Runtime for the local backend: "torch", "onnx" or "onnx-int8" (dynamically quantized ONNX)
+EMBEDDING_LOCAL_RUNTIME = os.getenv("EMBEDDING_LOCAL_RUNTIME", "torch")
+
+# Content-addressed cache of backend embeddings, keyed on (model id, normalized text)
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "embeddings.sqlite3"),
+)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
+_local_model = None
+_local_model_lock = threading.Lock()
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> SQLiteLRUCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = SQLiteLRUCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES, table="embeddings")
+    return _embedding_cache
+
+def embedding_model_id() -> str:
+    """Identify the model that produced a vector; part of every cache key."""
+    if EMBEDDING_BACKEND == "local":
+        return f"local:{EMBEDDING_MODEL}:{EMBEDDING_LOCAL_RUNTIME}"
+    return f"{EMBEDDING_BACKEND}:{EMBEDDING_MODEL}"
+
+def paper_embedding_text(paper: dict) -> str:
+    """The text a paper is embedded from: title followed by abstract."""
+    title = paper.get('title', '') or ''
+    abstract = paper.get('abstract', '') or ''
+    return f"{title} {abstract}".strip()
+
+def embedding_cache_key(text: str) -> str:
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(f"{embedding_model_id()}\n{normalized}".encode()).hexdigest()
+
+def _encode_vector(vector: List[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+def _decode_vector(blob: bytes) -> List[float]:
+    return np.frombuffer(blob, dtype=np.float32).astype(float).tolist()
+
+def get_cached_embedding(text: str) -> Optional[List[float]]:
+    """Look up a previously computed embedding without calling the backend.
+    Reads SQLite, so call it off the event loop."""
+    return get_cached_embeddings([text])[0]
+
+def get_cached_embeddings(texts: List[str]) -> List[Optional[List[float]]]:
+    """get_cached_embedding for many texts with one cache read."""
+    keys = [embedding_cache_key(text) if _is_embeddable(text) else None for text in texts]
+    cached = get_embedding_cache().get_many([key for key in keys if key])
+    return [_decode_vector(cached[key]) if key in cached else None for key in keys]
+
+def generate_simple_embedding(text: str, dim: int = 384) -> List[float]:
+    """Fallback: Generate simple hash-based embedding when HF API fails."""
+    # Tokenize and normalize
+    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
+    word_counts = Counter(words)
+
+    # Create a hash-based feature vector
+    embedding = [0.0] * dim
+    for word, count in word_counts.items():
+        # Hash word to a position in the vector
+        hash_val = int(hashlib.md5(word.encode()).hexdigest(), 16)
+        idx = hash_val % dim
+        # Add weighted count (log scale to reduce impact of very common words)
+        embedding[idx] += np.log1p(count)
+
+    # Normalize
+    norm = np.linalg.norm(embedding)
+    if norm > 0:
+        embedding = [x / norm for x in embedding]
+
+    return embedding
+
+def _is_embeddable(text: Optional[str]) -> bool:
+    return bool(text) and len(text.strip()) >= 10
+
+def _parse_vector(item) -> Optional[List[float]]:
+    """Return a flat float vector from one item of a feature-extraction response."""
+    if isinstance(item, list) and len(item) > 0 and isinstance(item[0], list):
+        item = item[0]
+    if isinstance(item, list) and len(item) > 0 and all(isinstance(x, (int, float)) for x in item):
+        return item
+    return None
+
+def _load_local_model():
+    """Load the sentence-transformers model once per process."""
+    global _local_model
+    if _local_model is None:
+        with _local_model_lock:
+            if _local_model is None:
+                from sentence_transformers import SentenceTransformer
+
+                kwargs = {"device": "cpu"}
+                if EMBEDDING_LOCAL_RUNTIME == "onnx":
+                    kwargs["backend"] = "onnx"
+                elif EMBEDDING_LOCAL_RUNTIME == "onnx-int8":
+                    kwargs["backend"] = "onnx"
+                    kwargs["model_kwargs"] = {"file_name": "onnx/model_quint8_avx2.onnx"}
+
+                print(f"Loading local embedding model {EMBEDDING_MODEL} ({EMBEDDING_LOCAL_RUNTIME})...")
+                _local_model = SentenceTransformer(EMBEDDING_MODEL, **kwargs)
+    return _local_model
+
+def _encode_local(texts: List[str]) -> list:
+    model = _load_local_model()
+    vectors = model.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False)
+    return vectors.astype(float).tolist()
+
+async def _embed_batch_local(texts: List[str]) -> Optional[list]:
+    """Embed a batch in-process on the CPU pool. Returns the vectors or None."""
+    try:
+        return await run_cpu_bound(_encode_local, texts)
+    except ImportError:
+        print("sentence-transformers is not installed - using fallback embedding")
+    except Exception as e:
+        print(f"Local embedding error ({type(e).__name__}): {e} - using fallback embedding")
+    return None
+
+async def _post_hf_batch(texts: List[str]) -> Optional[list]:
+    """Send one feature-extraction request for a list of texts. Returns the raw list or None."""
+    hf_token = os.getenv("HF_TOKEN", "")
+    headers = {"Authorization": f"Bearer {hf_token}"} if hf_token else {}
+    payload = {"inputs": texts, "options": {"wait_for_model": True}}
+
+    try:
+        async with http_client("huggingface") as client:
+            response = await client.post(HF_API_URL, headers=headers, json=payload)
+
+        # If model is loading (503), wait and retry once for the whole batch
+        if response.status_code == 503:
+            print("Model loading, waiting 15 seconds...")
+            await asyncio.sleep(15)
+            async with http_client("huggingface") as client:
+                response = await client.post(HF_API_URL, headers=headers, json=payload)
+
+        if response.status_code == 200:
+            result = response.json()
+            if isinstance(result, list) and len(result) == len(texts):
+                return result
+            print(f"HF API returned {len(result) if isinstance(result, list) else 'non-list'} vectors for {len(texts)} inputs")
+            return None
+
+        print(f"HF API error {response.status_code}: {response.text[:200]}")
+    except httpx.TimeoutException:
+        print("HF API timeout - using fallback embedding")
+    except Exception as e:
+        print(f"HF API error ({type(e).__name__}): {e} - using fallback embedding")
+    return None
+
+EMBEDDING_BACKENDS = {
+    "hf_api": _post_hf_batch,
+    "local": _embed_batch_local,
+}
+
+async def generate_embeddings(texts: List[str], batch_size: int = None, on_progress: Optional[Callable[[int], None]] = None) -> List[Optional[List[float]]]:
+    """Generate embeddings for many texts, one backend call per batch.
+
+    Results line up with `texts`. Texts that are too short get None; texts seen
+    before are served from the embedding cache; items the backend fails to
+    return fall back to the hash-based embedding individually (and are not cached).
+    `on_progress(n)` is called with the number of texts embedded so far.
+    """
+    batch_size = max(1, batch_size or EMBEDDING_BATCH_SIZE)
+    embed_batch = EMBEDDING_BACKENDS.get(EMBEDDING_BACKEND, _post_hf_batch)
+    results: List[Optional[List[float]]] = [None] * len(texts)
+
+    embeddable = []
+    for i, text in enumerate(texts):
+        if _is_embeddable(text):
+            embeddable.append(i)
+        else:
+            print(f"Text too short for embedding: {len(text) if text else 0} chars")
+
+    cache = get_embedding_cache()
+    keys = {i: embedding_cache_key(texts[i]) for i in embeddable}
+    cached = await run_in_threadpool(cache.get_many, list(keys.values()))
+    pending = []
+    for i in embeddable:
+        if keys[i] in cached:
+            results[i] = _decode_vector(cached[keys[i]])
+        else:
+            pending.append(i)
+    if cached:
+        print(f"✓ Embedding cache: {len(embeddable) - len(pending)}/{len(embeddable)} hits")
+    if on_progress:
+        on_progress(len(embeddable) - len(pending))
+
+    for start in range(0, len(pending), batch_size):
+        batch_idx = pending[start:start + batch_size]
+        raw = await embed_batch([texts[i] for i in batch_idx])
+
+        n_ok = 0
+        fresh = []
+        for pos, i in enumerate(batch_idx):
+            vector = _parse_vector(raw[pos]) if raw is not None else None
+            if vector is not None:
+                results[i] = vector
+                fresh.append((keys[i], _encode_vector(vector)))
+                n_ok += 1
+            else:
+                results[i] = generate_simple_embedding(texts[i])
+        await run_in_threadpool(cache.set_many, fresh)
+
+        print(f"✓ {EMBEDDING_BACKEND} batch: {n_ok}/{len(batch_idx)} embeddings"
+              + (f", {len(batch_idx) - n_ok} using fallback" if n_ok < len(batch_idx) else ""))
+        if on_progress:
+            on_progress(len(embeddable) - len(pending) + start + len(batch_idx))
+
+    return results
@@ -0,0 +1,91 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+
+# Outbound services: request timeout (seconds) and how many calls may be in flight at once
+HTTP_SERVICES = {
+    "arxiv": {"timeout": 30.0, "concurrency": int(os.getenv("ARXIV_CONCURRENCY", "2"))},
+    "semantic_scholar": {"timeout": 30.0, "concurrency": int(os.getenv("SEMANTIC_SCHOLAR_CONCURRENCY", "4"))},
+    "huggingface": {"timeout": 30.0, "concurrency": int(os.getenv("HF_CONCURRENCY", "4"))},
+    "supabase_auth": {"timeout": 10.0, "concurrency": 4},
+    "groq": {"timeout": 30.0, "concurrency": int(os.getenv("GROQ_CONCURRENCY", "4"))},
+}
+
+# Idle keep-alive connections are closed after this many seconds
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+_clients = {}
+_semaphores = {}
+_groq_client = None
+_loop = None
+
+def _check_loop():
+    """Clients and semaphores belong to one event loop. The app has a single
+    loop, but scripts that call asyncio.run() repeatedly get fresh ones."""
+    global _loop, _groq_client
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _clients.clear()
+        _semaphores.clear()
+        _groq_client = None
+        _loop = loop
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Shared keep-alive client for an outbound service, created on first use."""
+    _check_loop()
+    client = _clients.get(name)
+    if client is None:
+        config = HTTP_SERVICES[name]
+        client = httpx.AsyncClient(
+            timeout=config["timeout"],
+            limits=httpx.Limits(
+                max_connections=config["concurrency"],
+                max_keepalive_connections=config["concurrency"],
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _clients[name] = client
+    return client
+
+def _get_semaphore(name: str) -> asyncio.Semaphore:
+    _check_loop()
+    semaphore = _semaphores.get(name)
+    if semaphore is None:
+        semaphore = _semaphores[name] = asyncio.Semaphore(HTTP_SERVICES[name]["concurrency"])
+    return semaphore
+
+@asynccontextmanager
+async def http_client(name: str):
+    """Wait for a free slot for the service, then yield its shared client."""
+    async with _get_semaphore(name):
+        yield get_http_client(name)
+
+@asynccontextmanager
+async def groq_client(api_key: str):
+    """Shared AsyncGroq client over the pooled "groq" connection, one slot per call."""
+    global _groq_client
+    from groq import AsyncGroq
+
+    async with _get_semaphore("groq"):
+        if _groq_client is None or _groq_client.api_key != api_key:
+            _groq_client = AsyncGroq(
+                api_key=api_key,
+                http_client=get_http_client("groq"),
+                timeout=HTTP_SERVICES["groq"]["timeout"],
+            )
+        yield _groq_client
+
+async def start_http_clients():
+    for name in HTTP_SERVICES:
+        get_http_client(name)
+
+async def close_http_clients():
+    global _groq_client
+    clients = list(_clients.values())
+    _clients.clear()
+    _semaphores.clear()
+    _groq_client = None
+    for client in clients:
+        await client.aclose()
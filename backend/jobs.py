@@ -0,0 +1,140 @@
+import os
+import time
+import uuid
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Jobs that may run at once; the rest wait in "queued"
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Finished jobs stay pollable for this many seconds
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class Job:
+    """A unit of background work with status and progress that clients can poll."""
+
+    def __init__(self, kind: str, key: str, owner_id: Optional[str] = None, params: Optional[dict] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.owner_id = owner_id
+        self.params = params or {}
+        self.status = "queued"
+        self.progress: Dict[str, Any] = {}
+        self.result = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.finished_monotonic: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def update(self, **progress):
+        """Merge progress fields. Safe to call from worker threads."""
+        self.progress.update(progress)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": dict(self.params),
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+_jobs: Dict[str, Job] = {}
+_active: Dict[str, Job] = {}
+_latest: Dict[str, Job] = {}
+_semaphore: Optional[asyncio.Semaphore] = None
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(JOB_WORKERS)
+    return _semaphore
+
+def _prune():
+    cutoff = time.monotonic() - JOB_RESULT_TTL
+    for job_id, job in list(_jobs.items()):
+        if job.done and job.finished_monotonic < cutoff:
+            del _jobs[job_id]
+            if _latest.get(job.key) is job:
+                del _latest[job.key]
+
+async def _run(job: Job, func: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict):
+    try:
+        async with _get_semaphore():
+            job.status = "running"
+            job.started_at = _now()
+            job.result = await func(job, *args, **kwargs)
+            job.status = "succeeded"
+    except asyncio.CancelledError:
+        job.status = "failed"
+        job.status_code = 503
+        job.error = "Job was cancelled"
+        raise
+    except Exception as e:
+        # HTTPException-style errors keep their status code and detail
+        job.status = "failed"
+        job.status_code = getattr(e, "status_code", 500)
+        job.error = str(getattr(e, "detail", None) or e)
+        print(f"✗ Job {job.kind} {job.id} failed: {job.error}")
+    finally:
+        job.finished_at = _now()
+        job.finished_monotonic = time.monotonic()
+        if _active.get(job.key) is job:
+            del _active[job.key]
+
+def submit_job(kind: str, key: str, func: Callable[..., Awaitable[Any]], *args,
+               owner_id: Optional[str] = None, params: Optional[dict] = None, **kwargs):
+    """Start `func(job, *args, **kwargs)` in the background unless a job with the
+    same key is already queued or running, in which case that job is returned.
+    `params` records the options the job runs with, so a caller joining it can
+    check they are the ones it asked for.
+
+    Returns (job, created).
+    """
+    _prune()
+    existing = _active.get(key)
+    if existing is not None:
+        return existing, False
+
+    job = Job(kind, key, owner_id, params)
+    _jobs[job.id] = job
+    _active[key] = job
+    _latest[key] = job
+    job.task = asyncio.create_task(_run(job, func, args, kwargs))
+    return job, True
+
+async def wait_for_job(job: Job) -> Job:
+    """Wait for a job to finish. Cancelling the waiter doesn't cancel the job."""
+    if job.task is not None:
+        await asyncio.shield(job.task)
+    return job
+
+def get_job(job_id: str) -> Optional[Job]:
+    return _jobs.get(job_id)
+
+def latest_job(key: str) -> Optional[Job]:
+    """The running job for a key, or the last one to finish."""
+    return _active.get(key) or _latest.get(key)
+
+async def cancel_jobs():
+    """Cancel whatever is still running; called on shutdown."""
+    tasks = [job.task for job in _active.values() if job.task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -6,8 +7,19 @@ import os
 load_dotenv()
 
 from routers import auth, projects, papers, clustering
-
-app = FastAPI(title="Braindump API", version="1.0.0")
+from workers import shutdown_workers
+from http_clients import start_http_clients, close_http_clients
+from jobs import cancel_jobs
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_clients()
+    yield
+    await cancel_jobs()
+    await close_http_clients()
+    shutdown_workers()
+
+app = FastAPI(title="Braindump API", version="1.0.0", lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
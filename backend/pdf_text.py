@@ -0,0 +1,326 @@
+import io
+import os
+import re
+import importlib.util
+from typing import List, Optional
+
+import PyPDF2
+
+# "pymupdf", "pypdf" or "pypdf2"; "auto" uses the first one installed. PyPDF2 is
+# always installed and is the fallback when another backend fails on a file.
+PDF_TEXT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "auto")
+
+# The title and abstract are looked for on the first pages only
+PDF_MAX_PAGES = 2
+
+# Patterns for the title/abstract cleaners, compiled once
+# arXiv identifiers, dates, email addresses and section markers like "§", removed in
+# one pass. An address is only looked for where a run of [\w.-] starts: trying every
+# position inside the run finds the same "@" and costs more than the rest together.
+STRIPPED_TOKEN = re.compile(
+    r'arXiv:[^\s]+'
+    r'|\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}'
+    r'|(?<![\w.-])[\w.-]+@[\w.-]+\.\w+'
+    r'|§[^\s]*',
+    re.IGNORECASE,
+)
+NUMBERED_SECTION = re.compile(r'\n\s*\d+\.?\d*\s+[A-Z][a-z]+.*')
+# "\b\d+\s*$", written to start with the digit so the regex engine can skip ahead to digits
+PAGE_NUMBER = re.compile(r'\d(?<!\w\d)\d*\s*$', re.MULTILINE)
+AUTHOR_LINE = re.compile(r'^[A-Z][a-z]+(\s+[A-Z]\.?\s*)*[A-Z][a-z]+\s*,?$')
+HYPHEN_BREAK = re.compile(r'-\s*\n')
+HYPHENATED = re.compile(r'(\w)-\s*\n\s*(\w)')
+BROKEN_WORD = re.compile(r'\b([a-z])\s+([a-z]{1,2})\s+([a-z])')
+ABSTRACT_PREFIX = re.compile(r'^abstract[\s.:]+', re.IGNORECASE)
+ARXIV_LINE = re.compile(r'^arXiv:', re.IGNORECASE)
+DATE_LINE = re.compile(r'^\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)', re.IGNORECASE)
+AUTHOR_START = re.compile(r'^[A-Z][a-z]+\s+[A-Z]')
+INSTITUTION = re.compile(r'(University|Institut|Department)', re.IGNORECASE)
+ABSTRACT_HEADER = re.compile(r'\babstract\b[\s.:]*', re.IGNORECASE)
+CONTENTS = re.compile(r'\bcontents\b', re.IGNORECASE)
+# Section headers that end the abstract, as one alternation: its leftmost match is
+# the earliest of the individual markers
+ABSTRACT_END = re.compile(
+    r'\b(?:introduction|keywords|key\s*words|contents|1\s+introduction|1\.\s*introduction|i\.\s*introduction)\b'
+    r'|\n\s*(?:\d+\s*\n'  # Page numbers
+    r'|1\s+[A-Z])',  # Section 1 starting
+    re.IGNORECASE,
+)
+# Affiliation, address and correspondence lines, found in one pass over the whole
+# text; no alternative can cross a line break
+DROPPED_LINE = re.compile(
+    r'University|Institut|Department|Postfach|D-\d{5}|\d{5}[^\S\n]+[A-Z]|correspondence|address|email',
+    re.IGNORECASE,
+)
+# Characters an end marker spanning the page break could start with
+MARKER_TAIL = re.compile(r'(?:key|[\s\d.i])*$', re.IGNORECASE)
+
+def _drop_affiliation_lines(text: str) -> str:
+    """Drop address/affiliation/correspondence lines and lines that are just author names."""
+    dropped = set()
+    line_number, last = 0, 0
+    for match in DROPPED_LINE.finditer(text):
+        line_number += text.count('\n', last, match.start())
+        last = match.start()
+        dropped.add(line_number)
+
+    cleaned_lines = []
+    for i, line in enumerate(text.split('\n')):
+        if i in dropped:
+            continue
+        line_stripped = line.strip()
+        # Skip lines that are just author names (short, title case, possibly with commas)
+        if len(line_stripped) < 50 and 'A' <= line_stripped[:1] <= 'Z' and AUTHOR_LINE.match(line_stripped):
+            continue
+        cleaned_lines.append(line)
+    return '\n'.join(cleaned_lines)
+
+def clean_abstract_text(text: str) -> str:
+    """Thoroughly clean up extracted abstract text."""
+    if not text:
+        return ""
+    
+    # Remove arXiv identifiers, dates, email addresses and section markers like "§"
+    text = STRIPPED_TOKEN.sub('', text)
+    
+    # Remove "Contents" section and everything after
+    contents_match = CONTENTS.search(text)
+    if contents_match:
+        text = text[:contents_match.start()]
+    
+    # Remove numbered sections like "1 Introduction", "2.1 Methods"
+    text = NUMBERED_SECTION.sub('', text)
+    
+    # Remove page numbers
+    text = PAGE_NUMBER.sub('', text)
+    
+    # Remove institution/address lines (contain "University", "Institut", postal codes)
+    text = _drop_affiliation_lines(text)
+    
+    # Fix hyphenated words split across lines (e.g., "inter-\nest" -> "interest").
+    # Every match contains a "-\n" break, so the text before the first one is untouched.
+    hyphen_break = HYPHEN_BREAK.search(text)
+    if hyphen_break:
+        start = max(hyphen_break.start() - 1, 0)
+        text = text[:start] + HYPHENATED.sub(r'\1\2', text[start:])
+    
+    # Fix spacing issues from PDF extraction
+    # Remove single character followed by space that's likely a broken word
+    text = BROKEN_WORD.sub(r'\1\2\3', text)
+    
+    # Normalize whitespace: every run becomes one space, including at either end
+    words = text.split()
+    if words:
+        text = ' ' * text[0].isspace() + ' '.join(words) + ' ' * text[-1].isspace()
+    elif text:
+        text = ' '
+    
+    # Remove any remaining "Abstract." or "Abstract:" at the start
+    text = ABSTRACT_PREFIX.sub('', text)
+    
+    # Trim and clean up
+    text = text.strip()
+    
+    # Remove trailing incomplete sentences (end mid-word or with weird chars)
+    if text and not text[-1] in '.!?"\'':
+        # Find last complete sentence
+        last_period = text.rfind('.')
+        if last_period > len(text) * 0.5:  # Only trim if we're keeping most of it
+            text = text[:last_period + 1]
+    
+    return text
+
+def extract_abstract_from_text(text: str) -> str:
+    """Extract ONLY the abstract section from paper text."""
+    if not text:
+        return None
+    
+    # Find where "Abstract" starts
+    abstract_match = ABSTRACT_HEADER.search(text)
+    
+    if not abstract_match:
+        return None
+    
+    # Start right after "Abstract"
+    start_pos = abstract_match.end()
+    
+    # Find where abstract ends - look for common section headers
+    remaining_text = text[start_pos:]
+    
+    end_match = ABSTRACT_END.search(remaining_text)
+    end_pos = end_match.start() if end_match else len(remaining_text)
+    
+    abstract = remaining_text[:end_pos]
+    
+    # Clean it up
+    abstract = clean_abstract_text(abstract)
+    
+    # If abstract is too short, it probably failed
+    if len(abstract) < 100:
+        return None
+    
+    # If abstract is too long, truncate at a sentence boundary
+    if len(abstract) > 2000:
+        # Find a good breaking point
+        truncated = abstract[:2000]
+        last_period = truncated.rfind('.')
+        if last_period > 1000:
+            abstract = truncated[:last_period + 1]
+        else:
+            abstract = truncated
+    
+    return abstract
+
+def extract_title_from_text(text: str) -> str:
+    """Extract the paper title from the text."""
+    if not text:
+        return None
+    
+    lines = text.strip().split('\n')
+    
+    for line in lines[:15]:  # Check first 15 lines
+        line = line.strip()
+        
+        # Skip empty lines
+        if not line:
+            continue
+        
+        # Skip arXiv identifiers
+        if ARXIV_LINE.match(line):
+            continue
+        
+        # Skip dates
+        if DATE_LINE.match(line):
+            continue
+        
+        # Skip lines with email
+        if '@' in line:
+            continue
+        
+        # Skip very short lines
+        if len(line) < 10:
+            continue
+        
+        # Skip lines that look like author names (short, mostly proper nouns)
+        if len(line) < 40 and AUTHOR_START.match(line):
+            words = line.split()
+            if len(words) <= 4:
+                continue
+        
+        # Skip institution lines
+        if INSTITUTION.search(line):
+            continue
+        
+        # Skip lines starting with section markers
+        if line.startswith('§'):
+            continue
+        
+        # This looks like a title!
+        # Clean it up
+        title = ' '.join(line.split())
+        return title
+    
+    return None
+
+def _abstract_complete(text: str) -> bool:
+    """True once more text can't change extract_abstract_from_text's result: the
+    header and the earliest end marker both sit clear of the end of `text`, where
+    a match could still continue into the next page."""
+    abstract_match = ABSTRACT_HEADER.search(text)
+    if not abstract_match or abstract_match.end() >= len(text):
+        return False
+    tail_start = MARKER_TAIL.search(text).start()
+    match = ABSTRACT_END.search(text[abstract_match.end():])
+    return match is not None and abstract_match.end() + match.start() < tail_start
+
+def _title_complete(text: str) -> bool:
+    """True once the title lines extract_title_from_text looks at are all in `text`."""
+    return extract_title_from_text(text) is not None or len(text.strip().split('\n')) >= 15
+
+def _pages_pypdf2(file_content: bytes):
+    reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    for page in reader.pages[:PDF_MAX_PAGES]:
+        yield page.extract_text() or ""
+
+def _pages_pypdf(file_content: bytes):
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(file_content))
+    for page in reader.pages[:PDF_MAX_PAGES]:
+        yield page.extract_text() or ""
+
+def _pages_pymupdf(file_content: bytes):
+    import fitz
+    with fitz.open(stream=file_content, filetype="pdf") as doc:
+        for i in range(min(PDF_MAX_PAGES, doc.page_count)):
+            yield doc[i].get_text()
+
+# Page text generators, each parsing a page only when asked for it
+PDF_TEXT_BACKENDS = {
+    "pymupdf": (_pages_pymupdf, "fitz"),
+    "pypdf": (_pages_pypdf, "pypdf"),
+    "pypdf2": (_pages_pypdf2, "PyPDF2"),
+}
+
+def available_pdf_backends() -> List[str]:
+    return [name for name, (_, module) in PDF_TEXT_BACKENDS.items() if importlib.util.find_spec(module)]
+
+def pdf_text_backend() -> str:
+    """The configured backend if installed; "auto" takes the first installed one."""
+    available = available_pdf_backends()
+    if PDF_TEXT_BACKEND in available:
+        return PDF_TEXT_BACKEND
+    if PDF_TEXT_BACKEND != "auto":
+        print(f"PDF backend {PDF_TEXT_BACKEND} is not installed - using pypdf2")
+        return "pypdf2"
+    return available[0]
+
+def read_pdf_text(file_content: bytes, backend: str, early_exit: bool = True):
+    """Text of the first PDF_MAX_PAGES pages, one page at a time, stopping early once
+    the title and abstract can no longer change. Returns (text, pages parsed)."""
+    pages, _ = PDF_TEXT_BACKENDS[backend]
+    full_text = ""
+    pages_parsed = 0
+    for page_text in pages(file_content):
+        full_text += page_text + "\n"
+        pages_parsed += 1
+        if early_exit and _abstract_complete(full_text) and _title_complete(full_text):
+            break
+    return full_text, pages_parsed
+
+def extract_text_from_pdf(file_content: bytes, backend: Optional[str] = None, early_exit: bool = True) -> dict:
+    """Extract title and abstract from PDF."""
+    backend = backend or pdf_text_backend()
+    try:
+        try:
+            full_text, pages_parsed = read_pdf_text(file_content, backend, early_exit)
+        except Exception as e:
+            if backend == "pypdf2":
+                raise
+            print(f"PDF backend {backend} failed ({e}) - retrying with pypdf2")
+            backend = "pypdf2"
+            full_text, pages_parsed = read_pdf_text(file_content, backend, early_exit)
+        
+        if not full_text.strip():
+            return {"title": None, "abstract": None, "backend": backend, "pages_parsed": pages_parsed}
+        
+        # Extract title and abstract
+        title = extract_title_from_text(full_text)
+        abstract = extract_abstract_from_text(full_text)
+        
+        print(f"Extracted title: {title[:50] if title else 'None'}...")
+        print(f"Extracted abstract length: {len(abstract) if abstract else 0}")
+        
+        return {
+            "title": title,
+            "abstract": abstract,
+            "backend": backend,
+            "pages_parsed": pages_parsed
+        }
+    except Exception as e:
+        print(f"PDF extraction error: {e}")
+        return {"title": None, "abstract": None, "backend": backend, "pages_parsed": 0}
+
+def extract_text_from_pdf_file(path: str) -> dict:
+    """Same as extract_text_from_pdf, reading the PDF from disk; runs in worker processes."""
+    with open(path, "rb") as f:
+        return extract_text_from_pdf(f.read())
@@ -0,0 +1,66 @@
+import os
+import time
+from typing import Callable, List, Optional
+
+from postgrest.types import ReturnMethod
+
+# Rows per PostgREST upsert when writing back embeddings and cluster assignments
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "500"))
+
+# Ids per in.(...) filter. Filters travel in the GET query string, and 100 UUIDs
+# (~4 KB) stays well under the ~16 KB URL limit of the gateway in front of PostgREST
+ID_FILTER_CHUNK_SIZE = int(os.getenv("ID_FILTER_CHUNK_SIZE", "100"))
+
+async def existing_paper_ids(supabase, ids: List[str]) -> set:
+    """The subset of `ids` still in the papers table, looked up in URL-sized chunks."""
+    found = set()
+    for start in range(0, len(ids), ID_FILTER_CHUNK_SIZE):
+        response = await supabase.table("papers").select("id").in_("id", ids[start:start + ID_FILTER_CHUNK_SIZE]).execute()
+        found.update(row["id"] for row in response.data)
+    return found
+
+async def bulk_update_papers(supabase, rows: List[dict], batch_size: int = None, on_batch: Optional[Callable[[int], None]] = None) -> dict:
+    """Write per-paper column updates as batched upserts keyed on id.
+
+    Every row must carry `id` plus the NOT NULL columns (`project_id`, `title`),
+    since PostgREST resolves an upsert as INSERT ... ON CONFLICT (id) DO UPDATE,
+    and all rows in a call should have the same keys. This is only ever meant
+    as an UPDATE: right before each batch, rows whose paper no longer exists
+    (deleted while a clustering job ran) are dropped, so they aren't recreated.
+    A failed batch doesn't stop the others. Returns per-batch timings, the ids
+    that weren't written and the ids skipped as deleted. `on_batch(n)` is called
+    with the number of rows each successful batch got through.
+    """
+    batch_size = max(1, batch_size or WRITE_BATCH_SIZE)
+    report = {"rows": len(rows), "batches": [], "failed_ids": [], "deleted_ids": []}
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        batch_rows = len(batch)
+        t0 = time.perf_counter()
+        try:
+            existing_ids = await existing_paper_ids(supabase, [row["id"] for row in batch])
+            report["deleted_ids"].extend(row["id"] for row in batch if row["id"] not in existing_ids)
+            batch = [row for row in batch if row["id"] in existing_ids]
+            if batch:
+                await supabase.table("papers").upsert(
+                    batch, returning=ReturnMethod.minimal, default_to_null=False
+                ).execute()
+            ok = True
+        except Exception as e:
+            print(f"✗ Bulk write of {len(batch)} papers failed: {e}")
+            report["failed_ids"].extend(row["id"] for row in batch)
+            ok = False
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        report["batches"].append({"rows": len(batch), "ms": round(elapsed_ms, 1), "ok": ok})
+        if ok and on_batch:
+            on_batch(batch_rows)
+
+    total_ms = sum(b["ms"] for b in report["batches"])
+    report["total_ms"] = round(total_ms, 1)
+    if rows:
+        written = len(rows) - len(report['failed_ids']) - len(report['deleted_ids'])
+        deleted = f", {len(report['deleted_ids'])} deleted meanwhile" if report['deleted_ids'] else ""
+        print(f"✓ Wrote {written}/{len(rows)} papers "
+              f"in {len(report['batches'])} batches ({total_ms:.0f} ms){deleted}")
+    return report
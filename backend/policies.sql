@@ -87,3 +87,40 @@ CREATE POLICY "Users can delete clusters in their projects" ON clusters
         )
     );
 
+-- Cluster model policies
+CREATE POLICY "Users can view cluster models in their projects" ON cluster_models
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1 FROM projects 
+            WHERE projects.id = cluster_models.project_id 
+            AND projects.user_id = auth.uid()
+        )
+    );
+
+CREATE POLICY "Users can insert cluster models in their projects" ON cluster_models
+    FOR INSERT WITH CHECK (
+        EXISTS (
+            SELECT 1 FROM projects 
+            WHERE projects.id = cluster_models.project_id 
+            AND projects.user_id = auth.uid()
+        )
+    );
+
+CREATE POLICY "Users can update cluster models in their projects" ON cluster_models
+    FOR UPDATE USING (
+        EXISTS (
+            SELECT 1 FROM projects 
+            WHERE projects.id = cluster_models.project_id 
+            AND projects.user_id = auth.uid()
+        )
+    );
+
+CREATE POLICY "Users can delete cluster models in their projects" ON cluster_models
+    FOR DELETE USING (
+        EXISTS (
+            SELECT 1 FROM projects 
+            WHERE projects.id = cluster_models.project_id 
+            AND projects.user_id = auth.uid()
+        )
+    );
+
@@ -1,9 +1,35 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, EmailStr
-from database import get_supabase
+from typing import Optional
+from database import get_supabase, SUPABASE_URL
+from cache import TTLCache
+from http_clients import http_client
+from jose import jwt
+from jose.exceptions import JOSEError
+import hashlib
+import os
+import time
 
 router = APIRouter()
 
+# Supabase signs access tokens with the project JWT secret (HS256) or, for
+# asymmetric signing keys, a key published in the project's JWKS
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWKS_URL = f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+JWT_AUDIENCE = "authenticated"
+# Algorithms accepted for JWKS keys that don't name their own
+JWKS_ALGORITHMS = ["RS256", "ES256"]
+# A token without any of these claims is rejected
+JWT_REQUIRED_CLAIMS = {"require_aud": True, "require_exp": True, "require_sub": True}
+
+# Validated tokens are remembered briefly so repeat requests skip verification
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+JWKS_CACHE_TTL = float(os.getenv("JWKS_CACHE_TTL", "3600"))
+
+_token_cache = TTLCache(TOKEN_CACHE_MAX_ENTRIES, TOKEN_CACHE_TTL)
+_jwks = {"keys": None, "fetched_at": 0.0}
+
 class SignUpRequest(BaseModel):
     email: EmailStr
     password: str
@@ -18,11 +44,15 @@ class AuthResponse(BaseModel):
     access_token: str
     refresh_token: str
 
+class CurrentUser(BaseModel):
+    id: str
+    email: Optional[str] = None
+
 @router.post("/signup")
 async def signup(request: SignUpRequest):
-    supabase = get_supabase()
+    supabase = await get_supabase()
     try:
-        response = supabase.auth.sign_up({
+        response = await supabase.auth.sign_up({
             "email": request.email,
             "password": request.password
         })
@@ -41,9 +71,9 @@ async def signup(request: SignUpRequest):
 
 @router.post("/signin")
 async def signin(request: SignInRequest):
-    supabase = get_supabase()
+    supabase = await get_supabase()
     try:
-        response = supabase.auth.sign_in_with_password({
+        response = await supabase.auth.sign_in_with_password({
             "email": request.email,
             "password": request.password
         })
@@ -61,18 +91,18 @@ async def signin(request: SignInRequest):
 
 @router.post("/signout")
 async def signout():
-    supabase = get_supabase()
+    supabase = await get_supabase()
     try:
-        supabase.auth.sign_out()
+        await supabase.auth.sign_out()
         return {"message": "Signed out successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/refresh")
 async def refresh_token(refresh_token: str):
-    supabase = get_supabase()
+    supabase = await get_supabase()
     try:
-        response = supabase.auth.refresh_session(refresh_token)
+        response = await supabase.auth.refresh_session(refresh_token)
         if response.session:
             return {
                 "access_token": response.session.access_token,
@@ -83,19 +113,77 @@ async def refresh_token(refresh_token: str):
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
 
-def get_current_user(authorization: str = None):
+async def _get_signing_key(kid: Optional[str]) -> Optional[dict]:
+    """Public key for `kid` from the cached JWKS, refetching when stale or unknown."""
+    def find(keys):
+        return next((k for k in keys or [] if k.get("kid") == kid), None)
+    
+    key = find(_jwks["keys"])
+    if key and time.monotonic() - _jwks["fetched_at"] < JWKS_CACHE_TTL:
+        return key
+    try:
+        async with http_client("supabase_auth") as client:
+            response = await client.get(SUPABASE_JWKS_URL)
+        if response.status_code == 200:
+            _jwks["keys"] = response.json().get("keys", [])
+            _jwks["fetched_at"] = time.monotonic()
+            return find(_jwks["keys"])
+    except Exception as e:
+        print(f"JWKS fetch failed: {e}")
+    return key
+
+async def _verify_token_locally(token: str) -> Optional[dict]:
+    """Verify signature, expiry, audience and subject without calling the auth server.
+    
+    Returns the claims, or None if no key is available locally. Raises JOSEError
+    for tokens that are invalid. The accepted algorithms come from our own
+    configuration, never from the token: HS256 only with the project secret, and
+    for a JWKS key the algorithm the key declares.
+    """
+    header = jwt.get_unverified_header(token)
+    if header.get("alg") == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            return None
+        key = SUPABASE_JWT_SECRET
+        algorithms = ["HS256"]
+    else:
+        key = await _get_signing_key(header.get("kid"))
+        if key is None:
+            return None
+        algorithms = [key["alg"]] if key.get("alg") else JWKS_ALGORITHMS
+    return jwt.decode(token, key, algorithms=algorithms, audience=JWT_AUDIENCE, options=JWT_REQUIRED_CLAIMS)
+
+async def get_current_user(authorization: str = None) -> CurrentUser:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     
     token = authorization.replace("Bearer ", "")
-    supabase = get_supabase()
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     try:
-        response = supabase.auth.get_user(token)
-        if response.user:
-            return response.user
-        else:
+        claims = await _verify_token_locally(token)
+    except JOSEError as e:
+        raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
+    
+    if claims is not None:
+        user = CurrentUser(id=claims["sub"], email=claims.get("email"))
+        expires_at = claims.get("exp")
+    else:
+        # No local key for this token: ask the auth server
+        supabase = await get_supabase()
+        try:
+            response = await supabase.auth.get_user(token)
+        except Exception as e:
+            raise HTTPException(status_code=401, detail=str(e))
+        if not response or not response.user:
             raise HTTPException(status_code=401, detail="Invalid token")
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=str(e))
-
+        user = CurrentUser(id=response.user.id, email=response.user.email)
+        expires_at = jwt.get_unverified_claims(token).get("exp")
+    
+    # Never cache a token past its own expiry
+    ttl = TOKEN_CACHE_TTL if expires_at is None else min(TOKEN_CACHE_TTL, expires_at - time.time())
+    _token_cache.set(cache_key, user, ttl)
+    return user
@@ -1,108 +1,56 @@
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 from database import get_supabase
 from routers.auth import get_current_user
+from routers.projects import verify_project_ownership
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import silhouette_score
+from embeddings import generate_embeddings, get_embedding_cache, paper_embedding_text
+from embedding_storage import embedding_fields, embedding_matrix, has_embedding
+from workers import run_cpu_bound
+from http_clients import groq_client
+from cache import SQLiteLRUCache
+from persistence import bulk_update_papers
+from postgrest.types import ReturnMethod
+from jobs import Job, submit_job, wait_for_job, get_job, latest_job
+from clustering_engine import sweep_k, select_engine, mean_pairwise_cosine
+from similarity import top_k_similarity_edges
+from vector_index import index_papers
 import os
-import requests
+import uuid
+import asyncio
 import hashlib
 
 router = APIRouter()
 
-HF_API_URL = "https://api-inference.huggingface.co/pipeline/feature-extraction/sentence-transformers/all-MiniLM-L6-v2"
+# Incremental clustering: new papers go to the nearest stored centroid unless the
+# project has grown or drifted too far from the last full clustering
+INCREMENTAL_MIN_PAPERS = int(os.getenv("INCREMENTAL_MIN_PAPERS", "10"))
+INCREMENTAL_MAX_NEW_FRACTION = float(os.getenv("INCREMENTAL_MAX_NEW_FRACTION", "0.25"))
+INCREMENTAL_DRIFT_FACTOR = float(os.getenv("INCREMENTAL_DRIFT_FACTOR", "1.5"))
 
-def generate_simple_embedding(text: str, dim: int = 384) -> List[float]:
-    """Fallback: Generate simple hash-based embedding when HF API fails."""
-    import re
-    from collections import Counter
-    
-    # Tokenize and normalize
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    word_counts = Counter(words)
-    
-    # Create a hash-based feature vector
-    embedding = [0.0] * dim
-    for word, count in word_counts.items():
-        # Hash word to a position in the vector
-        hash_val = int(hashlib.md5(word.encode()).hexdigest(), 16)
-        idx = hash_val % dim
-        # Add weighted count (log scale to reduce impact of very common words)
-        embedding[idx] += np.log1p(count)
-    
-    # Normalize
-    norm = np.linalg.norm(embedding)
-    if norm > 0:
-        embedding = [x / norm for x in embedding]
-    
-    return embedding
-
-def generate_embedding(text: str) -> List[float]:
-    """Generate embeddings using Hugging Face Inference API (free), with fallback."""
-    if not text or len(text.strip()) < 10:
-        print(f"Text too short for embedding: {len(text) if text else 0} chars")
-        return None
-    
-    hf_token = os.getenv("HF_TOKEN", "")
-    headers = {"Authorization": f"Bearer {hf_token}"} if hf_token else {}
-    
-    # Try HuggingFace API first
-    try:
-        response = requests.post(
-            HF_API_URL,
-            headers=headers,
-            json={"inputs": text, "options": {"wait_for_model": True}},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            embedding = response.json()
-            if isinstance(embedding, list) and len(embedding) > 0:
-                if isinstance(embedding[0], list):
-                    result = embedding[0]
-                else:
-                    result = embedding
-                
-                if isinstance(result, list) and len(result) > 0:
-                    print(f"✓ HF API embedding: {len(result)} dimensions")
-                    return result
-        
-        print(f"HF API error {response.status_code}: {response.text[:200]}")
-        
-        # If model is loading (503), wait and retry once
-        if response.status_code == 503:
-            import time
-            print("Model loading, waiting 15 seconds...")
-            time.sleep(15)
-            response = requests.post(
-                HF_API_URL,
-                headers=headers,
-                json={"inputs": text, "options": {"wait_for_model": True}},
-                timeout=30
-            )
-            if response.status_code == 200:
-                embedding = response.json()
-                if isinstance(embedding, list) and len(embedding) > 0:
-                    if isinstance(embedding[0], list):
-                        print(f"✓ HF API embedding (retry): {len(embedding[0])} dimensions")
-                        return embedding[0]
-                    print(f"✓ HF API embedding (retry): {len(embedding)} dimensions")
-                    return embedding
-        
-    except requests.exceptions.Timeout:
-        print("HF API timeout - using fallback embedding")
-    except Exception as e:
-        print(f"HF API error ({type(e).__name__}): {e} - using fallback embedding")
-    
-    # Fallback to simple embedding
-    print("Using fallback hash-based embedding")
-    return generate_simple_embedding(text)
+# Neighbours per paper in the graph; edges for this value are stored at clustering time
+GRAPH_NEIGHBORS = int(os.getenv("GRAPH_NEIGHBORS", "10"))
 
-def compute_2d_projection(embeddings: np.ndarray) -> np.ndarray:
-    """Project high-dimensional embeddings to 2D using PCA."""
+# Cluster names from the LLM, cached on disk by a fingerprint of the member paper ids
+CLUSTER_LABEL_MODEL = os.getenv("CLUSTER_LABEL_MODEL", "llama-3.1-8b-instant")
+LABEL_CACHE_PATH = os.getenv(
+    "LABEL_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "cluster_labels.sqlite3"),
+)
+LABEL_CACHE_MAX_ENTRIES = int(os.getenv("LABEL_CACHE_MAX_ENTRIES", "10000"))
+
+_label_cache = None
+
+def project_2d(embeddings: np.ndarray):
+    """Project high-dimensional embeddings to 2D. Returns positions and the fitted
+    PCA, or None when a fixed arrangement was used instead."""
     from sklearn.decomposition import PCA
     
     n_samples = len(embeddings)
@@ -111,7 +59,7 @@ def compute_2d_projection(embeddings: np.ndarray) -> np.ndarray:
         positions = np.zeros((n_samples, 2))
         for i in range(n_samples):
             positions[i] = [i * 200 + 100, 250]
-        return positions
+        return positions, None
     
     try:
         if np.allclose(embeddings, embeddings[0]):
@@ -119,7 +67,7 @@ def compute_2d_projection(embeddings: np.ndarray) -> np.ndarray:
             for i in range(n_samples):
                 angle = 2 * np.pi * i / n_samples
                 positions[i] = [300 + 200 * np.cos(angle), 300 + 200 * np.sin(angle)]
-            return positions
+            return positions, None
         
         n_components = min(2, n_samples - 1, embeddings.shape[1])
         pca = PCA(n_components=n_components)
@@ -128,14 +76,76 @@ def compute_2d_projection(embeddings: np.ndarray) -> np.ndarray:
         if result.shape[1] == 1:
             result = np.column_stack([result, np.zeros(n_samples)])
         
-        return result
+        return result, pca
     except Exception as e:
         print(f"PCA error: {e}")
         positions = np.zeros((n_samples, 2))
         cols = int(np.ceil(np.sqrt(n_samples)))
         for i in range(n_samples):
             positions[i] = [(i % cols) * 150 + 100, (i // cols) * 150 + 100]
-        return positions
+        return positions, None
+
+def compute_graph_layout(papers_with_embeddings: List[dict], neighbors: int = GRAPH_NEIGHBORS, min_similarity: Optional[float] = None,
+                         embeddings: Optional[np.ndarray] = None) -> dict:
+    """2D positions (scaled to the 100-900 canvas), sparse same-cluster edges, and
+    the projection needed to place papers added later. `embeddings` is the papers'
+    embedding matrix if the caller already decoded it."""
+    if embeddings is None:
+        embeddings = embedding_matrix(papers_with_embeddings)
+    
+    # Compute 2D positions using PCA
+    positions, pca = project_2d(embeddings)
+    
+    # Normalize positions to a reasonable range
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    positions = (positions - low) / (high - low + 1e-6)
+    positions = positions * 800 + 100  # Scale to 100-900 range
+    
+    projection = None
+    if pca is not None and pca.components_.shape[0] == 2:
+        projection = {
+            "mean": pca.mean_.tolist(),
+            "components": pca.components_.tolist(),
+            "min": low.tolist(),
+            "max": high.tolist()
+        }
+    
+    # Similarity edges - ONLY connect papers within the SAME cluster, keeping each
+    # paper's top-k neighbours instead of every pair
+    cluster_ids = np.array([-1 if paper.get('cluster_id') is None else paper['cluster_id'] for paper in papers_with_embeddings])
+    edges = top_k_similarity_edges(embeddings, k=neighbors, groups=cluster_ids, min_similarity=min_similarity)
+    
+    return {"positions": positions, "edges": edges, "projection": projection}
+
+def place_with_projection(embeddings: np.ndarray, projection: Optional[dict]) -> np.ndarray:
+    """Place papers added since the last clustering using the stored PCA and scaling."""
+    if projection is None or len(embeddings) == 0:
+        # No projection to reuse: put them near the middle of the canvas
+        return np.array([[500 + 40 * (i % 5), 500 + 40 * (i // 5)] for i in range(len(embeddings))], dtype=float).reshape(-1, 2)
+    
+    positions = (embeddings - np.array(projection['mean'])) @ np.array(projection['components']).T
+    low, high = np.array(projection['min']), np.array(projection['max'])
+    return (positions - low) / (high - low + 1e-6) * 800 + 100
+
+def graph_node(paper: dict, x: float, y: float) -> dict:
+    return {
+        "id": paper['id'],
+        "title": paper.get('title', 'Untitled'),
+        "abstract": paper.get('abstract', ''),
+        "authors": paper.get('authors', ''),
+        "year": paper.get('year'),
+        "cluster_id": paper.get('cluster_id', 0),
+        "x": float(x),
+        "y": float(y)
+    }
+
+def graph_edge(source_id: str, target_id: str, similarity: float) -> dict:
+    # Line thickness will be based on similarity
+    return {
+        "source": source_id,
+        "target": target_id,
+        "similarity": max(similarity, 0.1)  # Minimum 0.1 for visibility
+    }
 
 def extract_keywords_from_papers(papers: List[dict]) -> List[str]:
     """Extract common keywords from paper titles and abstracts."""
@@ -186,24 +196,201 @@ def generate_cluster_name_from_keywords(keywords: List[str]) -> str:
     capitalized = [k.capitalize() for k in keywords[:3]]
     return " & ".join(capitalized)
 
-async def generate_cluster_summary(papers_in_cluster: List[dict]) -> str:
+def compute_hybrid_embeddings(embeddings: np.ndarray, texts: List[str], vectorizer_state: Optional[dict] = None):
+    """Combine semantic embeddings with TF-IDF features (70% semantic, 30% TF-IDF).
+
+    Fits a new TF-IDF vectorizer unless `vectorizer_state` (a stored vocabulary
+    and idf) is given. Returns the hybrid matrix and the vectorizer state, which
+    is None when only semantic embeddings were used.
+    """
+    if vectorizer_state is not None and not vectorizer_state.get('vocabulary'):
+        return embeddings, None
+    
+    try:
+        if vectorizer_state is None:
+            vectorizer = TfidfVectorizer(max_features=100, stop_words='english', min_df=1)
+            tfidf_matrix = vectorizer.fit_transform(texts).toarray()
+        else:
+            vectorizer = TfidfVectorizer(stop_words='english', vocabulary=vectorizer_state['vocabulary'])
+            vectorizer.idf_ = np.array(vectorizer_state['idf'])
+            tfidf_matrix = vectorizer.transform(texts).toarray()
+        
+        # Combine semantic embeddings with TF-IDF features
+        # Normalize both to similar scales
+        tfidf_norm = tfidf_matrix / (np.linalg.norm(tfidf_matrix, axis=1, keepdims=True) + 1e-8)
+        embedding_norm = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+        
+        # Weighted combination: 70% semantic, 30% TF-IDF
+        # Pad TF-IDF to match embedding dimension if needed
+        if tfidf_norm.shape[1] < embedding_norm.shape[1]:
+            padding = np.zeros((tfidf_norm.shape[0], embedding_norm.shape[1] - tfidf_norm.shape[1]))
+            tfidf_padded = np.hstack([tfidf_norm, padding])
+        else:
+            tfidf_padded = tfidf_norm[:, :embedding_norm.shape[1]]
+        
+        hybrid_embeddings = 0.7 * embedding_norm + 0.3 * tfidf_padded
+        state = {
+            'vocabulary': {term: int(idx) for term, idx in vectorizer.vocabulary_.items()},
+            'idf': vectorizer.idf_.tolist()
+        }
+        print("✓ Using hybrid embeddings (semantic + TF-IDF)")
+    except Exception as e:
+        print(f"TF-IDF failed ({e}), using semantic embeddings only")
+        hybrid_embeddings = embeddings
+        state = None
+    
+    return hybrid_embeddings, state
+
+def compute_cluster_centroids(embeddings: np.ndarray, labels: np.ndarray, n_clusters: int):
+    """Mean vector per cluster, plus the mean distance of papers to their own centroid."""
+    centroids = np.array([
+        embeddings[labels == k].mean(axis=0) if np.any(labels == k) else np.zeros(embeddings.shape[1])
+        for k in range(n_clusters)
+    ])
+    distances = np.linalg.norm(embeddings - centroids[labels], axis=1)
+    return centroids, float(distances.mean())
+
+def assign_to_centroids(embeddings: np.ndarray, centroids: np.ndarray):
+    """Nearest-centroid assignment in O(k·d) per paper. Returns labels and distances."""
+    distances = np.linalg.norm(embeddings[:, None, :] - centroids[None, :, :], axis=2)
+    labels = distances.argmin(axis=1)
+    return labels, distances[np.arange(len(labels)), labels]
+
+def incremental_fallback_reason(model: Optional[dict], n_new: int) -> Optional[str]:
+    """Why new papers can't simply be assigned to the stored clusters, or None if they can."""
+    if model is None:
+        return "no stored cluster model"
+    if len(model.get('centroids') or []) != model.get('n_clusters'):
+        return "stored cluster model is incomplete"
+    if model['n_papers'] < INCREMENTAL_MIN_PAPERS:
+        return "project too small for incremental assignment"
+    if (model.get('n_assigned_since_fit') or 0) + n_new > INCREMENTAL_MAX_NEW_FRACTION * model['n_papers']:
+        return "too many papers added since the last full clustering"
+    return None
+
+def find_optimal_clusters(embeddings, max_clusters=8, engine="exact", on_k_done=None):
+    """Find the optimal number of clusters using silhouette score.
+
+    `engine` is "exact" (KMeans, full silhouette) or "minibatch" for large projects.
+    `on_k_done(k)` is called as each candidate k of the sweep is scored.
+    """
+    n_samples = len(embeddings)
+
+    # Can't cluster if too few samples
+    if n_samples < 2:
+        return 1, np.zeros(n_samples, dtype=int)
+
+    # If only 2 samples, check similarity
+    if n_samples == 2:
+        similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+        print(f"  Pair similarity: {similarity:.3f}")
+        if similarity > 0.65:  # High similarity = 1 cluster
+            return 1, np.zeros(2, dtype=int)
+        else:
+            return 2, np.array([0, 1])
+
+    # If 3 samples, try k=1, 2, 3
+    if n_samples == 3:
+        # Check pairwise similarities
+        sim_matrix = cosine_similarity(embeddings)
+        sim_01 = sim_matrix[0][1]
+        sim_02 = sim_matrix[0][2]
+        sim_12 = sim_matrix[1][2]
+
+        # If two are very similar and third is different, use 2 clusters
+        if (sim_01 > 0.7 and sim_02 < 0.5 and sim_12 < 0.5) or \
+           (sim_02 > 0.7 and sim_01 < 0.5 and sim_12 < 0.5) or \
+           (sim_12 > 0.7 and sim_01 < 0.5 and sim_02 < 0.5):
+            # Two similar, one different
+            if sim_01 > 0.7:
+                return 2, np.array([0, 0, 1])
+            elif sim_02 > 0.7:
+                return 2, np.array([0, 1, 0])
+            else:
+                return 2, np.array([0, 1, 1])
+        # If all similar, 1 cluster
+        elif sim_01 > 0.6 and sim_02 > 0.6 and sim_12 > 0.6:
+            return 1, np.zeros(3, dtype=int)
+        # Otherwise, try k=2 and k=3
+        else:
+            best_score = -1
+            best_k = 2
+            best_labels = np.array([0, 0, 1])
+
+            for k in [2, 3]:
+                try:
+                    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+                    labels = kmeans.fit_predict(embeddings)
+                    score = silhouette_score(embeddings, labels)
+                    print(f"  k={k}: silhouette score = {score:.3f}")
+                    if score > best_score:
+                        best_score = score
+                        best_k = k
+                        best_labels = labels
+                except:
+                    continue
+
+            return best_k, best_labels
+
+    # For 4+ samples, try different k values
+    max_k = min(max_clusters, n_samples - 1)
+    best_score = -1
+    best_k = 1
+    best_labels = np.zeros(n_samples, dtype=int)
+
+    # Fits for different k are independent; sweep_k may run them in parallel
+    sweep = sweep_k(embeddings, range(2, max_k + 1), n_init=20, max_iter=300, engine=engine, on_k_done=on_k_done)
+    for k in range(2, max_k + 1):
+        labels, score, error = sweep[k]
+        if error is not None:
+            print(f"  k={k}: error - {error}")
+            continue
+        print(f"  k={k}: silhouette score = {score:.3f}")
+
+        if score > best_score:
+            best_score = score
+            best_k = k
+            best_labels = labels
+
+    # If best score is very low, check if 1 cluster makes sense
+    if best_score < 0.15:
+        print(f"  Low silhouette score ({best_score:.3f}), checking if 1 cluster is better...")
+        avg_similarity = mean_pairwise_cosine(embeddings)
+        if avg_similarity > 0.65:  # All papers are quite similar
+            print(f"  High average similarity ({avg_similarity:.3f}), using 1 cluster")
+            return 1, np.zeros(n_samples, dtype=int)
+
+    print(f"  Optimal: k={best_k} with score={best_score:.3f}")
+    return best_k, best_labels
+
+def build_graph_nodes_and_edges(papers_with_embeddings: List[dict], neighbors: int = GRAPH_NEIGHBORS, min_similarity: Optional[float] = None):
+    """Compute 2D node positions and sparse same-cluster similarity edges."""
+    layout = compute_graph_layout(papers_with_embeddings, neighbors, min_similarity)
+    nodes = [graph_node(paper, x, y) for paper, (x, y) in zip(papers_with_embeddings, layout['positions'])]
+    edges = [
+        graph_edge(papers_with_embeddings[i]['id'], papers_with_embeddings[j]['id'], similarity)
+        for i, j, similarity in layout['edges']
+    ]
+    
+    return nodes, edges
+
+async def generate_llm_cluster_label(papers_in_cluster: List[dict]) -> Optional[str]:
+    """Ask Groq for a short topic label. Returns None if it isn't configured or fails."""
     groq_api_key = os.getenv("GROQ_API_KEY")
+    if not groq_api_key or groq_api_key == "your_groq_api_key_here":
+        return None
     
-    # First try Groq API if available
-    if groq_api_key and groq_api_key != "your_groq_api_key_here":
-        try:
-            from groq import Groq
-            client = Groq(api_key=groq_api_key)
-            
-            # Prepare context from papers
-            context = ""
-            for p in papers_in_cluster[:5]:
-                context += f"Title: {p.get('title', 'N/A')}\n"
-                if p.get('abstract'):
-                    context += f"Abstract: {p.get('abstract', '')[:300]}\n\n"
-            
-            response = client.chat.completions.create(
-                model="llama-3.1-8b-instant",
+    try:
+        # Prepare context from papers
+        context = ""
+        for p in papers_in_cluster[:5]:
+            context += f"Title: {p.get('title', 'N/A')}\n"
+            if p.get('abstract'):
+                context += f"Abstract: {p.get('abstract', '')[:300]}\n\n"
+        
+        async with groq_client(groq_api_key) as client:
+            response = await client.chat.completions.create(
+                model=CLUSTER_LABEL_MODEL,
                 messages=[
                     {
                         "role": "system",
@@ -217,69 +404,182 @@ async def generate_cluster_summary(papers_in_cluster: List[dict]) -> str:
                 max_tokens=30,
                 temperature=0.3
             )
-            
-            summary = response.choices[0].message.content.strip()
-            # Clean up any quotes or extra punctuation
-            summary = summary.strip('"\'')
-            return summary
-        except Exception as e:
-            print(f"Groq API error: {e}")
-    
-    # Fallback: generate name from extracted keywords
-    keywords = extract_keywords_from_papers(papers_in_cluster)
-    return generate_cluster_name_from_keywords(keywords)
+        
+        summary = response.choices[0].message.content.strip()
+        # Clean up any quotes or extra punctuation
+        summary = summary.strip('"\'')
+        return summary
+    except Exception as e:
+        print(f"Groq API error: {e}")
+        return None
 
-@router.post("/cluster/{project_id}")
-async def cluster_papers(project_id: str, authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+def cluster_fingerprint(papers_in_cluster: List[dict]) -> str:
+    """Identify a cluster by its members, independent of order and cluster number."""
+    member_ids = "\n".join(sorted(str(p['id']) for p in papers_in_cluster))
+    return hashlib.sha256(member_ids.encode()).hexdigest()
+
+def get_label_cache() -> SQLiteLRUCache:
+    global _label_cache
+    if _label_cache is None:
+        _label_cache = SQLiteLRUCache(LABEL_CACHE_PATH, LABEL_CACHE_MAX_ENTRIES, table="cluster_labels")
+    return _label_cache
+
+async def generate_cluster_summaries(clusters: Dict[int, List[dict]]) -> Dict[int, str]:
+    """Name every cluster, concurrently. LLM labels are cached by member fingerprint,
+    so clusters whose membership hasn't changed cost no LLM call."""
+    cache = get_label_cache()
+    keys = {cluster_id: f"{CLUSTER_LABEL_MODEL}:{cluster_fingerprint(members)}" for cluster_id, members in clusters.items()}
+    cached = await run_in_threadpool(cache.get_many, list(keys.values()))
+    summaries = {cluster_id: cached[key].decode() for cluster_id, key in keys.items() if key in cached}
+    
+    missing = [cluster_id for cluster_id in clusters if cluster_id not in summaries]
+    if summaries:
+        print(f"✓ Cluster label cache: {len(summaries)}/{len(clusters)} hits")
+    
+    # The shared Groq client limits how many of these are in flight at once
+    labels = await asyncio.gather(*(generate_llm_cluster_label(clusters[cluster_id]) for cluster_id in missing))
+    for cluster_id, label in zip(missing, labels):
+        if label:
+            summaries[cluster_id] = label
+        else:
+            keywords = extract_keywords_from_papers(clusters[cluster_id])
+            summaries[cluster_id] = generate_cluster_name_from_keywords(keywords)
+    # Keyword fallbacks are cheap to recompute and the LLM may be back next time
+    await run_in_threadpool(cache.set_many, [(keys[cluster_id], label.encode()) for cluster_id, label in zip(missing, labels) if label])
     
-    # Verify project ownership
-    project = supabase.table("projects").select("id").eq("id", project_id).eq("user_id", user.id).execute()
-    if not project.data or len(project.data) == 0:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return {cluster_id: summaries[cluster_id] for cluster_id in clusters}
+
+def paper_write_row(paper: dict, **updates) -> dict:
+    """Upsert row for an existing paper: its key and NOT NULL columns plus the updated fields."""
+    return {"id": paper['id'], "project_id": paper['project_id'], "title": paper['title'], **updates}
+
+async def save_cluster_assignments(supabase, papers: List[dict], write_timings: dict, on_batch=None):
+    """Bulk-write cluster_id and layout position; any failed batch fails the request."""
+    report = await bulk_update_papers(supabase, [
+        paper_write_row(p, cluster_id=p['cluster_id'], layout_x=p['layout_x'], layout_y=p['layout_y'])
+        for p in papers
+    ], on_batch=on_batch)
+    write_timings["cluster_ids"] = report
+    if report["failed_ids"]:
+        raise HTTPException(status_code=500, detail=f"Failed to save cluster assignments for {len(report['failed_ids'])} papers")
+
+async def load_cluster_model(supabase, project_id: str) -> Optional[dict]:
+    """Fetch the stored TF-IDF vocabulary and centroids from the last full clustering."""
+    try:
+        response = await supabase.table("cluster_models").select(
+            "n_clusters, vocabulary, idf, mean_distance, n_papers, n_assigned_since_fit"
+        ).eq("project_id", project_id).execute()
+        if not response.data:
+            return None
+        model = response.data[0]
+        clusters = await supabase.table("clusters").select("cluster_number, centroid").eq("project_id", project_id).order("cluster_number").execute()
+        model['centroids'] = [c['centroid'] for c in clusters.data if c.get('centroid')]
+        return model
+    except Exception as e:
+        print(f"Could not load cluster model: {e}")
+        return None
+
+async def save_cluster_model(supabase, project_id: str, vectorizer_state: Optional[dict], centroids: np.ndarray, mean_distance: float, n_papers: int):
+    """Persist centroids and the fitted vectorizer so later papers can be assigned incrementally."""
+    try:
+        await supabase.table("clusters").delete().eq("project_id", project_id).execute()
+        await supabase.table("clusters").insert([
+            {"project_id": project_id, "cluster_number": k, "centroid": centroid.tolist()}
+            for k, centroid in enumerate(centroids)
+        ]).execute()
+        await supabase.table("cluster_models").upsert({
+            "project_id": project_id,
+            "n_clusters": len(centroids),
+            "vocabulary": (vectorizer_state or {}).get('vocabulary', {}),
+            "idf": (vectorizer_state or {}).get('idf', []),
+            "mean_distance": mean_distance,
+            "n_papers": n_papers,
+            "n_assigned_since_fit": 0
+        }).execute()
+    except Exception as e:
+        print(f"✗ Failed to save cluster model: {e}")
+
+async def save_graph_layout(supabase, project_id: str, layout: dict, papers: List[dict]) -> Optional[str]:
+    """Store the edges and projection computed at clustering time under a new layout version."""
+    version = uuid.uuid4().hex
+    try:
+        await supabase.table("cluster_models").update({
+            "layout_version": version,
+            "layout_projection": layout['projection'],
+            "graph_neighbors": GRAPH_NEIGHBORS,
+            "graph_edges": [[papers[i]['id'], papers[j]['id'], round(sim, 4)] for i, j, sim in layout['edges']]
+        }).eq("project_id", project_id).execute()
+        return version
+    except Exception as e:
+        print(f"✗ Failed to save graph layout: {e}")
+        return None
+
+async def run_clustering(job: Job, supabase, project_id: str, batch_size: Optional[int], mode: str) -> dict:
+    """Embed, cluster, lay out and name a project's papers, reporting progress on `job`."""
+    job.update(stage="loading")
     
     # Get all papers in project
-    papers_response = supabase.table("papers").select("*").eq("project_id", project_id).execute()
+    papers_response = await supabase.table("papers").select(
+        "id, project_id, title, abstract, embedding, embedding_packed, cluster_id, layout_x, layout_y"
+    ).eq("project_id", project_id).execute()
     papers = papers_response.data
+    job.update(papers_total=len(papers), papers_embedded=0, writes_done=0)
+    
+    def count_writes(n):
+        job.update(writes_done=job.progress["writes_done"] + n)
     
     if len(papers) < 2:
         raise HTTPException(status_code=400, detail="Need at least 2 papers to cluster")
     
-    # Generate embeddings for papers that don't have them
-    updated_papers = []
+    # Generate embeddings for papers that don't have them, batching the API calls
     failed_papers = []
+    write_timings = {}
+    pending = []
     
     for paper in papers:
-        if not paper.get('embedding'):
+        if not has_embedding(paper):
             title = paper.get('title', '') or ''
             abstract = paper.get('abstract', '') or ''
-            text = f"{title} {abstract}".strip()
+            text = paper_embedding_text(paper)
             
             if not text or len(text) < 10:
                 print(f"Paper {paper.get('id', 'unknown')} has no text content (title: {len(title)} chars, abstract: {len(abstract)} chars)")
                 failed_papers.append(paper.get('title', 'Untitled'))
                 continue
             
-            print(f"Generating embedding for paper: {paper.get('title', 'Untitled')[:50]}...")
-            embedding = generate_embedding(text)
-            
+            pending.append((paper, text))
+    
+    if pending:
+        print(f"Generating embeddings for {len(pending)} papers in batches of {batch_size or 'default'}...")
+        job.update(stage="embedding", papers_to_embed=len(pending))
+        embeddings_out = await generate_embeddings(
+            [text for _, text in pending], batch_size=batch_size,
+            on_progress=lambda n: job.update(papers_embedded=n)
+        )
+        
+        embedded = []
+        for (paper, _), embedding in zip(pending, embeddings_out):
             if embedding and len(embedding) > 0:
-                try:
-                    supabase.table("papers").update({"embedding": embedding}).eq("id", paper['id']).execute()
-                    paper['embedding'] = embedding
-                    print(f"✓ Embedding saved for: {paper.get('title', 'Untitled')[:50]}")
-                except Exception as e:
-                    print(f"✗ Failed to save embedding: {e}")
-                    failed_papers.append(paper.get('title', 'Untitled'))
+                embedded.append((paper, embedding))
             else:
                 print(f"✗ Failed to generate embedding for: {paper.get('title', 'Untitled')[:50]}")
                 failed_papers.append(paper.get('title', 'Untitled'))
         
-        updated_papers.append(paper)
+        write_timings["embeddings"] = await bulk_update_papers(supabase, [
+            paper_write_row(paper, **embedding_fields(embedding)) for paper, embedding in embedded
+        ], on_batch=count_writes)
+        failed_ids = set(write_timings["embeddings"]["failed_ids"])
+        for paper, embedding in embedded:
+            if paper['id'] in failed_ids:
+                failed_papers.append(paper.get('title', 'Untitled'))
+            else:
+                # Cluster on what was stored, so a later run sees the same vectors
+                paper.update(embedding_fields(embedding))
+        deleted_ids = set(write_timings["embeddings"]["deleted_ids"])
+        index_papers(project_id, [paper for paper, _ in embedded if paper['id'] not in failed_ids | deleted_ids])
     
     # Filter papers with embeddings
-    papers_with_embeddings = [p for p in updated_papers if p.get('embedding')]
+    papers_with_embeddings = [p for p in papers if has_embedding(p)]
     
     print(f"Total papers: {len(papers)}, Papers with embeddings: {len(papers_with_embeddings)}")
     
@@ -289,176 +589,298 @@ async def cluster_papers(project_id: str, authorization: str = Header(None)):
             error_msg += f" Failed papers: {', '.join(failed_papers[:5])}"
         raise HTTPException(status_code=400, detail=error_msg)
     
-    embeddings = np.array([p['embedding'] for p in papers_with_embeddings])
+    embeddings = embedding_matrix(papers_with_embeddings)
     n_papers = len(papers_with_embeddings)
     
-    # Enhanced clustering: Use hybrid approach with TF-IDF + semantic embeddings
-    # This improves accuracy for cases like food vs climate change
-    print(f"Computing hybrid embeddings for {n_papers} papers...")
-    
-    # Get TF-IDF features as additional signal
-    texts = []
-    for paper in papers_with_embeddings:
-        title = paper.get('title', '') or ''
-        abstract = paper.get('abstract', '') or ''
-        texts.append(f"{title} {abstract}".strip())
-    
-    try:
-        vectorizer = TfidfVectorizer(max_features=100, stop_words='english', min_df=1)
-        tfidf_matrix = vectorizer.fit_transform(texts).toarray()
+    # Try to assign only the unclustered papers to the stored clusters
+    job.update(stage="clustering")
+    clustering_mode = "full"
+    engine = None
+    fallback_reason = "full re-clustering requested" if mode == "full" else None
+    if mode == "auto":
+        model = await load_cluster_model(supabase, project_id)
+        new_idx = [i for i, p in enumerate(papers_with_embeddings) if p.get('cluster_id') is None]
+        fallback_reason = incremental_fallback_reason(model, len(new_idx))
         
-        # Combine semantic embeddings with TF-IDF features
-        # Normalize both to similar scales
-        tfidf_norm = tfidf_matrix / (np.linalg.norm(tfidf_matrix, axis=1, keepdims=True) + 1e-8)
-        embedding_norm = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+        if fallback_reason is None and new_idx:
+            new_texts = [paper_embedding_text(papers_with_embeddings[i]) for i in new_idx]
+            new_hybrid, _ = await run_cpu_bound(compute_hybrid_embeddings, embeddings[new_idx], new_texts, model)
+            new_labels, distances = await run_cpu_bound(assign_to_centroids, new_hybrid, np.array(model['centroids']))
+            
+            if distances.mean() > INCREMENTAL_DRIFT_FACTOR * model['mean_distance']:
+                fallback_reason = f"new papers are far from existing clusters (mean distance {distances.mean():.3f} vs {model['mean_distance']:.3f})"
+            else:
+                new_papers = [papers_with_embeddings[i] for i in new_idx]
+                for paper, label in zip(new_papers, new_labels):
+                    paper['cluster_id'] = int(label)
+                await supabase.table("cluster_models").update({
+                    "n_assigned_since_fit": (model.get('n_assigned_since_fit') or 0) + len(new_idx)
+                }).eq("project_id", project_id).execute()
         
-        # Weighted combination: 70% semantic, 30% TF-IDF
-        # Pad TF-IDF to match embedding dimension if needed
-        if tfidf_norm.shape[1] < embedding_norm.shape[1]:
-            padding = np.zeros((tfidf_norm.shape[0], embedding_norm.shape[1] - tfidf_norm.shape[1]))
-            tfidf_padded = np.hstack([tfidf_norm, padding])
+        if fallback_reason is None:
+            clustering_mode = "incremental"
+            n_clusters = model['n_clusters']
+            print(f"✓ Assigned {len(new_idx)} new papers to {n_clusters} existing clusters")
         else:
-            tfidf_padded = tfidf_norm[:, :embedding_norm.shape[1]]
-        
-        hybrid_embeddings = 0.7 * embedding_norm + 0.3 * tfidf_padded
-        print("✓ Using hybrid embeddings (semantic + TF-IDF)")
-    except Exception as e:
-        print(f"TF-IDF failed ({e}), using semantic embeddings only")
-        hybrid_embeddings = embeddings
-    
-    # Find optimal number of clusters using silhouette score
-    from sklearn.metrics import silhouette_score
+            print(f"Full re-clustering: {fallback_reason}")
     
-    def find_optimal_clusters(embeddings, max_clusters=8):
-        """Find the optimal number of clusters using silhouette score."""
-        n_samples = len(embeddings)
+    if clustering_mode == "full":
+        # Enhanced clustering: Use hybrid approach with TF-IDF + semantic embeddings
+        # This improves accuracy for cases like food vs climate change
+        print(f"Computing hybrid embeddings for {n_papers} papers...")
         
-        # Can't cluster if too few samples
-        if n_samples < 2:
-            return 1, np.zeros(n_samples, dtype=int)
+        # Get TF-IDF features as additional signal
+        texts = [paper_embedding_text(paper) for paper in papers_with_embeddings]
+        hybrid_embeddings, vectorizer_state = await run_cpu_bound(compute_hybrid_embeddings, embeddings, texts)
         
-        # If only 2 samples, check similarity
-        if n_samples == 2:
-            similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-            print(f"  Pair similarity: {similarity:.3f}")
-            if similarity > 0.65:  # High similarity = 1 cluster
-                return 1, np.zeros(2, dtype=int)
-            else:
-                return 2, np.array([0, 1])
-        
-        # If 3 samples, try k=1, 2, 3
-        if n_samples == 3:
-            # Check pairwise similarities
-            sim_matrix = cosine_similarity(embeddings)
-            sim_01 = sim_matrix[0][1]
-            sim_02 = sim_matrix[0][2]
-            sim_12 = sim_matrix[1][2]
-            
-            # If two are very similar and third is different, use 2 clusters
-            if (sim_01 > 0.7 and sim_02 < 0.5 and sim_12 < 0.5) or \
-               (sim_02 > 0.7 and sim_01 < 0.5 and sim_12 < 0.5) or \
-               (sim_12 > 0.7 and sim_01 < 0.5 and sim_02 < 0.5):
-                # Two similar, one different
-                if sim_01 > 0.7:
-                    return 2, np.array([0, 0, 1])
-                elif sim_02 > 0.7:
-                    return 2, np.array([0, 1, 0])
-                else:
-                    return 2, np.array([0, 1, 1])
-            # If all similar, 1 cluster
-            elif sim_01 > 0.6 and sim_02 > 0.6 and sim_12 > 0.6:
-                return 1, np.zeros(3, dtype=int)
-            # Otherwise, try k=2 and k=3
-            else:
-                best_score = -1
-                best_k = 2
-                best_labels = np.array([0, 0, 1])
-                
-                for k in [2, 3]:
-                    try:
-                        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-                        labels = kmeans.fit_predict(embeddings)
-                        score = silhouette_score(embeddings, labels)
-                        print(f"  k={k}: silhouette score = {score:.3f}")
-                        if score > best_score:
-                            best_score = score
-                            best_k = k
-                            best_labels = labels
-                    except:
-                        continue
-                
-                return best_k, best_labels
-        
-        # For 4+ samples, try different k values
-        max_k = min(max_clusters, n_samples - 1)
-        best_score = -1
-        best_k = 1
-        best_labels = np.zeros(n_samples, dtype=int)
-        
-        for k in range(2, max_k + 1):
-            try:
-                kmeans = KMeans(n_clusters=k, random_state=42, n_init=20, max_iter=300)
-                labels = kmeans.fit_predict(embeddings)
-                score = silhouette_score(embeddings, labels)
-                print(f"  k={k}: silhouette score = {score:.3f}")
-                
-                if score > best_score:
-                    best_score = score
-                    best_k = k
-                    best_labels = labels
-            except Exception as e:
-                print(f"  k={k}: error - {e}")
-                continue
+        # Find optimal clustering using hybrid embeddings
+        engine = select_engine(n_papers)
+        print(f"Finding optimal clusters for {n_papers} papers ({engine} engine)...")
+        job.update(k_tried=0, k_total=max(0, min(8, n_papers - 1) - 1) if n_papers >= 4 else 0)
+        n_clusters, cluster_labels = await run_cpu_bound(
+            find_optimal_clusters, hybrid_embeddings, engine=engine,
+            on_k_done=lambda k: job.update(k_tried=job.progress["k_tried"] + 1)
+        )
         
-        # If best score is very low, check if 1 cluster makes sense
-        if best_score < 0.15:
-            print(f"  Low silhouette score ({best_score:.3f}), checking if 1 cluster is better...")
-            sim_matrix = cosine_similarity(embeddings)
-            avg_similarity = (sim_matrix.sum() - n_samples) / (n_samples * (n_samples - 1))
-            if avg_similarity > 0.65:  # All papers are quite similar
-                print(f"  High average similarity ({avg_similarity:.3f}), using 1 cluster")
-                return 1, np.zeros(n_samples, dtype=int)
+        # Update papers with cluster IDs
+        for i, paper in enumerate(papers_with_embeddings):
+            paper['cluster_id'] = int(cluster_labels[i])
         
-        print(f"  Optimal: k={best_k} with score={best_score:.3f}")
-        return best_k, best_labels
-    
-    # Find optimal clustering using hybrid embeddings
-    print(f"Finding optimal clusters for {n_papers} papers...")
-    n_clusters, cluster_labels = find_optimal_clusters(hybrid_embeddings)
-    
-    # Update papers with cluster IDs
-    for i, paper in enumerate(papers_with_embeddings):
-        cluster_id = int(cluster_labels[i])
-        supabase.table("papers").update({"cluster_id": cluster_id}).eq("id", paper['id']).execute()
-        paper['cluster_id'] = cluster_id
+        centroids, mean_distance = await run_cpu_bound(compute_cluster_centroids, hybrid_embeddings, np.asarray(cluster_labels), n_clusters)
+        await save_cluster_model(supabase, project_id, vectorizer_state, centroids, mean_distance, n_papers)
+    
+    job.update(stage="layout")
+    stored_layout = await load_graph_layout(supabase, project_id) if clustering_mode == "incremental" else None
+    if stored_layout is not None:
+        # Keep every node where it is and the stored edges; papers without a
+        # position are placed with the stored projection, and only the papers
+        # that were assigned or placed now are written
+        unplaced = [i for i, p in enumerate(papers_with_embeddings) if p.get('layout_x') is None or p.get('layout_y') is None]
+        positions = place_with_projection(embeddings[unplaced], stored_layout.get('layout_projection'))
+        for i, (x, y) in zip(unplaced, positions):
+            papers_with_embeddings[i]['layout_x'], papers_with_embeddings[i]['layout_y'] = float(x), float(y)
+        changed = sorted(set(new_idx) | set(unplaced))
+        job.update(stage="saving")
+        await save_cluster_assignments(supabase, [papers_with_embeddings[i] for i in changed], write_timings, on_batch=count_writes)
+        layout_version = stored_layout['layout_version']
+    else:
+        # Lay out the graph once here so /graph can serve it without recomputing
+        layout = await run_cpu_bound(compute_graph_layout, papers_with_embeddings, embeddings=embeddings)
+        for paper, (x, y) in zip(papers_with_embeddings, layout['positions']):
+            paper['layout_x'], paper['layout_y'] = float(x), float(y)
+        job.update(stage="saving")
+        await save_cluster_assignments(supabase, papers_with_embeddings, write_timings, on_batch=count_writes)
+        layout_version = await save_graph_layout(supabase, project_id, layout, papers_with_embeddings)
     
     # Generate cluster summaries
-    cluster_summaries = {}
-    for cluster_id in range(n_clusters):
-        cluster_papers = [p for p in papers_with_embeddings if p.get('cluster_id') == cluster_id]
-        if cluster_papers:
-            summary = await generate_cluster_summary(cluster_papers)
-            cluster_summaries[cluster_id] = summary
+    job.update(stage="naming")
+    members = {}
+    for paper in papers_with_embeddings:
+        members.setdefault(paper['cluster_id'], []).append(paper)
+    cluster_summaries = await generate_cluster_summaries(
+        {cluster_id: members[cluster_id] for cluster_id in range(n_clusters) if cluster_id in members}
+    )
+    await save_cluster_summaries(supabase, project_id, n_clusters, members, cluster_summaries)
     
     return {
         "message": "Clustering complete",
         "n_clusters": n_clusters,
         "cluster_summaries": cluster_summaries,
-        "papers_clustered": len(papers_with_embeddings)
+        "papers_clustered": len(papers_with_embeddings),
+        "mode": clustering_mode,
+        "engine": engine,
+        "layout_version": layout_version,
+        "write_timings": write_timings,
+        "full_recluster_reason": fallback_reason if clustering_mode == "full" else None
+    }
+
+async def save_cluster_summaries(supabase, project_id: str, n_clusters: int, members: Dict[int, List[dict]], summaries: Dict[int, str]):
+    """Store each cluster's label, size and member fingerprint in one upsert."""
+    try:
+        await supabase.table("clusters").upsert([
+            {
+                "project_id": project_id,
+                "cluster_number": cluster_id,
+                "label": summaries.get(cluster_id),
+                "size": len(members.get(cluster_id, [])),
+                "member_version": cluster_fingerprint(members[cluster_id]) if cluster_id in members else None
+            }
+            for cluster_id in range(n_clusters)
+        ], on_conflict="project_id,cluster_number", returning=ReturnMethod.minimal, default_to_null=False).execute()
+    except Exception as e:
+        print(f"✗ Failed to save cluster summaries: {e}")
+
+async def load_cluster_summaries(supabase, project_id: str) -> Dict[int, dict]:
+    """Stored label, size and member version per cluster number."""
+    try:
+        response = await supabase.table("clusters").select(
+            "cluster_number, label, size, member_version"
+        ).eq("project_id", project_id).execute()
+        return {c['cluster_number']: c for c in response.data}
+    except Exception as e:
+        print(f"Could not load cluster summaries: {e}")
+        return {}
+
+def build_graph_clusters(papers: List[dict], stored: Dict[int, dict]) -> dict:
+    """Per-cluster paper count and sample titles in one pass, with the stored labels."""
+    clusters = {}
+    for paper in papers:
+        cluster_id = paper.get('cluster_id')
+        if cluster_id is None:
+            continue
+        cluster = clusters.get(cluster_id)
+        if cluster is None:
+            summary = stored.get(cluster_id, {})
+            cluster = clusters[cluster_id] = {
+                "id": cluster_id,
+                "label": summary.get('label'),
+                "member_version": summary.get('member_version'),
+                "paper_count": 0,
+                "sample_titles": []
+            }
+        cluster['paper_count'] += 1
+        if len(cluster['sample_titles']) < 3:
+            cluster['sample_titles'].append(paper.get('title', 'Untitled'))
+    return clusters
+
+@router.post("/cluster/{project_id}")
+async def cluster_papers(
+    project_id: str,
+    batch_size: Optional[int] = Query(None, ge=1, le=256),
+    mode: str = Query("auto", pattern="^(auto|full)$"),
+    wait: bool = Query(True, description="Wait for the result; false returns 202 with a job id to poll"),
+    authorization: str = Header(None)
+):
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
+    
+    # Verify project ownership
+    await verify_project_ownership(supabase, user.id, project_id)
+    
+    # One clustering run per project; a repeated request joins the one in flight
+    # if it asks for the same options, and is refused otherwise
+    params = {"mode": mode, "batch_size": batch_size}
+    job, created = submit_job("cluster", f"cluster:{project_id}", run_clustering,
+                              supabase, project_id, batch_size, mode, owner_id=user.id, params=params)
+    if not created:
+        if job.params != params:
+            raise HTTPException(status_code=409, detail=(
+                f"Clustering job {job.id} is already running for this project with "
+                f"mode={job.params['mode']}, batch_size={job.params['batch_size']}"
+            ))
+        print(f"Clustering already in progress for project {project_id} (job {job.id})")
+    
+    if not wait:
+        return JSONResponse(status_code=202, content={"job_id": job.id, "status": job.status, "coalesced": not created})
+    
+    await wait_for_job(job)
+    if job.status == "failed":
+        raise HTTPException(status_code=job.status_code, detail=job.error)
+    return {**job.result, "job_id": job.id, "coalesced": not created}
+
+@router.get("/cluster/jobs/{job_id}")
+async def get_cluster_job(job_id: str, authorization: str = Header(None)):
+    """Status and progress of a clustering job; includes the result once it has succeeded."""
+    user = await get_current_user(authorization)
+    job = get_job(job_id)
+    if job is None or job.kind != "cluster" or job.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/cluster/{project_id}/job")
+async def get_latest_cluster_job(project_id: str, authorization: str = Header(None)):
+    """The project's running clustering job, or the most recent finished one."""
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
+    await verify_project_ownership(supabase, user.id, project_id)
+    
+    job = latest_job(f"cluster:{project_id}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="No clustering job for this project")
+    return job.to_dict()
+
+@router.get("/embeddings/cache")
+async def embedding_cache_stats(authorization: str = Header(None)):
+    """Hit/miss counters for the embedding cache since process start."""
+    await get_current_user(authorization)
+    return await run_in_threadpool(get_embedding_cache().stats)
+
+async def load_graph_layout(supabase, project_id: str) -> Optional[dict]:
+    try:
+        response = await supabase.table("cluster_models").select(
+            "layout_version, layout_projection, graph_neighbors, graph_edges"
+        ).eq("project_id", project_id).execute()
+        if response.data and response.data[0].get('layout_version'):
+            return response.data[0]
+    except Exception as e:
+        print(f"Could not load graph layout: {e}")
+    return None
+
+async def stored_graph_data(supabase, project_id: str, stored: dict) -> Optional[dict]:
+    """Graph from stored positions and edges; only papers added since get placed now."""
+    papers_response = await supabase.table("papers").select(
+        "id, title, abstract, authors, year, cluster_id, layout_x, layout_y"
+    ).eq("project_id", project_id).execute()
+    papers = papers_response.data or []
+    
+    laid_out = [p for p in papers if p.get('layout_x') is not None and p.get('layout_y') is not None]
+    if len(laid_out) < 2:
+        return None
+    nodes = [graph_node(p, p['layout_x'], p['layout_y']) for p in laid_out]
+    
+    if len(laid_out) < len(papers):
+        # Filtered on layout_x rather than an id list, which can outgrow the URL after a large import
+        new_response = await supabase.table("papers").select("id, embedding, embedding_packed").eq(
+            "project_id", project_id
+        ).is_("layout_x", "null").execute()
+        embedded = {p['id']: p for p in new_response.data if has_embedding(p)}
+        new_papers = [p for p in papers if p['id'] in embedded]
+        if new_papers:
+            new_embeddings = embedding_matrix([embedded[p['id']] for p in new_papers])
+            positions = place_with_projection(new_embeddings, stored.get('layout_projection'))
+            nodes.extend(graph_node(p, x, y) for p, (x, y) in zip(new_papers, positions))
+    
+    node_ids = set(node['id'] for node in nodes)
+    edges = [
+        graph_edge(source, target, similarity)
+        for source, target, similarity in (stored.get('graph_edges') or [])
+        if source in node_ids and target in node_ids
+    ]
+    
+    clusters = build_graph_clusters(nodes, await load_cluster_summaries(supabase, project_id))
+    
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "clusters": clusters,
+        "layout_version": stored['layout_version']
     }
 
 @router.get("/graph/{project_id}")
-async def get_graph_data(project_id: str, authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+async def get_graph_data(
+    project_id: str,
+    neighbors: int = Query(GRAPH_NEIGHBORS, ge=1, le=100),
+    min_similarity: Optional[float] = Query(None, ge=-1, le=1),
+    authorization: str = Header(None)
+):
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
     # Verify project ownership
-    project = supabase.table("projects").select("id").eq("id", project_id).eq("user_id", user.id).execute()
-    if not project.data or len(project.data) == 0:
-        raise HTTPException(status_code=404, detail="Project not found")
+    await verify_project_ownership(supabase, user.id, project_id)
+    
+    # Serve the layout stored at clustering time when it matches the request
+    if min_similarity is None:
+        stored = await load_graph_layout(supabase, project_id)
+        if stored and stored.get('graph_neighbors') == neighbors:
+            graph = await stored_graph_data(supabase, project_id, stored)
+            if graph is not None:
+                return graph
     
     # Get all papers with embeddings
-    papers_response = supabase.table("papers").select("*").eq("project_id", project_id).execute()
+    papers_response = await supabase.table("papers").select(
+        "id, title, abstract, authors, year, cluster_id, embedding, embedding_packed"
+    ).eq("project_id", project_id).execute()
     papers = papers_response.data
     
     # If no papers at all, return empty graph
@@ -469,7 +891,7 @@ async def get_graph_data(project_id: str, authorization: str = Header(None)):
             "clusters": {}
         }
     
-    papers_with_embeddings = [p for p in papers if p.get('embedding')]
+    papers_with_embeddings = [p for p in papers if has_embedding(p)]
     
     # If less than 2 papers with embeddings, show papers without clustering visualization
     if len(papers_with_embeddings) < 2:
@@ -493,72 +915,9 @@ async def get_graph_data(project_id: str, authorization: str = Header(None)):
             "clusters": {}
         }
     
-    embeddings = np.array([p['embedding'] for p in papers_with_embeddings])
-    
-    # Compute 2D positions using PCA
-    positions = compute_2d_projection(embeddings)
+    nodes, edges = await run_cpu_bound(build_graph_nodes_and_edges, papers_with_embeddings, neighbors, min_similarity)
     
-    # Normalize positions to a reasonable range
-    positions = (positions - positions.min(axis=0)) / (positions.max(axis=0) - positions.min(axis=0) + 1e-6)
-    positions = positions * 800 + 100  # Scale to 100-900 range
-    
-    # Build nodes
-    nodes = []
-    for i, paper in enumerate(papers_with_embeddings):
-        nodes.append({
-            "id": paper['id'],
-            "title": paper.get('title', 'Untitled'),
-            "abstract": paper.get('abstract', ''),
-            "authors": paper.get('authors', ''),
-            "year": paper.get('year'),
-            "cluster_id": paper.get('cluster_id', 0),
-            "x": float(positions[i][0]),
-            "y": float(positions[i][1])
-        })
-    
-    # Compute similarity edges - ONLY connect papers within the SAME cluster
-    similarity_matrix = cosine_similarity(embeddings)
-    edges = []
-    
-    # Group papers by cluster
-    cluster_groups = {}
-    for i, paper in enumerate(papers_with_embeddings):
-        cluster_id = paper.get('cluster_id', 0)
-        if cluster_id not in cluster_groups:
-            cluster_groups[cluster_id] = []
-        cluster_groups[cluster_id].append(i)
-    
-    # For each cluster, connect ALL papers within that cluster
-    for cluster_id, paper_indices in cluster_groups.items():
-        # Connect every pair of papers in this cluster
-        for idx_i in range(len(paper_indices)):
-            for idx_j in range(idx_i + 1, len(paper_indices)):
-                i = paper_indices[idx_i]
-                j = paper_indices[idx_j]
-                
-                similarity = float(similarity_matrix[i][j])
-                paper_i = papers_with_embeddings[i]
-                paper_j = papers_with_embeddings[j]
-                
-                # Always connect papers in the same cluster (no threshold)
-                # Line thickness will be based on similarity
-                edges.append({
-                    "source": paper_i['id'],
-                    "target": paper_j['id'],
-                    "similarity": max(similarity, 0.1)  # Minimum 0.1 for visibility
-                })
-    
-    # Get cluster summaries
-    clusters = {}
-    unique_clusters = set(p.get('cluster_id') for p in papers_with_embeddings if p.get('cluster_id') is not None)
-    for cluster_id in unique_clusters:
-        cluster_papers = [p for p in papers_with_embeddings if p.get('cluster_id') == cluster_id]
-        titles = [p.get('title', 'Untitled') for p in cluster_papers[:3]]
-        clusters[cluster_id] = {
-            "id": cluster_id,
-            "paper_count": len(cluster_papers),
-            "sample_titles": titles
-        }
+    clusters = build_graph_clusters(papers_with_embeddings, await load_cluster_summaries(supabase, project_id))
     
     return {
         "nodes": nodes,
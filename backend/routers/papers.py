@@ -1,15 +1,105 @@
-from fastapi import APIRouter, HTTPException, Header, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Header, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, List
 from database import get_supabase
 from routers.auth import get_current_user
+from routers.projects import verify_project_ownership
+from workers import run_cpu_bound, run_in_process
+from embeddings import get_cached_embedding, get_cached_embeddings, paper_embedding_text
+from embedding_storage import embedding_fields, embedding_list
+from vector_index import get_project_index, index_papers, unindex_papers
+from pdf_text import extract_text_from_pdf, extract_text_from_pdf_file
+from http_clients import http_client
+from cache import SQLiteLRUCache
+from persistence import ID_FILTER_CHUNK_SIZE
+import os
+import time
+import shutil
+import weakref
+import tempfile
 import httpx
 import re
-import PyPDF2
-import io
+import json
+import base64
+import asyncio
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime
 
 router = APIRouter()
 
+# Columns returned by the papers endpoints by default. The 384-float embedding
+# (and layout) must be asked for explicitly with fields=.
+PAPER_SUMMARY_FIELDS = [
+    "id", "project_id", "title", "abstract", "authors", "doi", "arxiv_id",
+    "year", "file_url", "cluster_id", "created_at", "updated_at"
+]
+PAPER_FIELDS = PAPER_SUMMARY_FIELDS + ["embedding", "layout_x", "layout_y"]
+
+def parse_paper_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated fields= value against the papers columns."""
+    if not fields:
+        return list(PAPER_SUMMARY_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in PAPER_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown paper fields: {', '.join(unknown)}")
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+# Rows fetched per page when streaming a project's papers
+STREAM_PAGE_SIZE = 200
+
+def encode_cursor(paper: dict) -> str:
+    raw = json.dumps([paper['created_at'], paper['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str):
+    """(created_at, id) from a cursor. Both go into a PostgREST filter string, so
+    anything but an ISO-8601 timestamp and a UUID is rejected."""
+    try:
+        created_at, paper_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        datetime.fromisoformat(created_at)
+        return created_at, str(uuid.UUID(paper_id))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def fetch_papers_page(supabase, project_id: str, columns: List[str], limit: Optional[int], cursor: Optional[str] = None):
+    """One page of a project's papers, newest first, using keyset pagination on
+    (created_at, id). Returns the rows and the cursor for the next page."""
+    select_columns = columns + [c for c in ("created_at",) if c not in columns]
+    if "embedding" in columns:
+        select_columns.append("embedding_packed")
+    query = supabase.table("papers").select(",".join(select_columns)).eq("project_id", project_id)
+    if cursor:
+        created_at, paper_id = decode_cursor(cursor)
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{paper_id})')
+    query = query.order("created_at", desc=True).order("id", desc=True)
+    if limit is None:
+        response = await query.execute()
+        return unpack_embeddings(response.data), None
+    
+    # Fetch one extra row to know whether another page exists
+    response = await query.limit(limit + 1).execute()
+    rows = response.data
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return unpack_embeddings(rows[:limit]), next_cursor
+
+def unpack_embeddings(papers: List[dict]) -> List[dict]:
+    """Return embeddings as lists of floats whichever format they are stored in."""
+    for paper in papers:
+        if "embedding_packed" in paper:
+            paper["embedding"] = embedding_list(paper)
+            del paper["embedding_packed"]
+    return papers
+
+def paper_summary(paper: dict) -> dict:
+    """Drop the columns that aren't part of the default papers response."""
+    return {k: v for k, v in paper.items() if k not in ("embedding", "embedding_packed", "layout_x", "layout_y")}
+
 class PaperCreate(BaseModel):
     project_id: str
     doi: Optional[str] = None
@@ -60,279 +150,260 @@ def extract_doi(url_or_doi: str) -> str:
             return match.group(1)
     return url_or_doi
 
+# Local cache of arXiv and Semantic Scholar lookups, shared by uploads and bulk imports
+METADATA_CACHE_PATH = os.getenv(
+    "METADATA_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "metadata.sqlite3"),
+)
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "100000"))
+METADATA_CACHE_TTL = float(os.getenv("METADATA_CACHE_TTL", str(30 * 24 * 3600)))
+# Lookups that found nothing are kept for less time, in case the record appears upstream later
+METADATA_CACHE_NEGATIVE_TTL = float(os.getenv("METADATA_CACHE_NEGATIVE_TTL", str(24 * 3600)))
+# Serve lookups from the cache only and never call upstream (e.g. against a recorded cache file)
+METADATA_CACHE_OFFLINE = os.getenv("METADATA_CACHE_OFFLINE", "").lower() in ("1", "true", "yes")
+
+_metadata_cache = None
+
+def get_metadata_cache() -> SQLiteLRUCache:
+    global _metadata_cache
+    if _metadata_cache is None:
+        _metadata_cache = SQLiteLRUCache(METADATA_CACHE_PATH, METADATA_CACHE_MAX_ENTRIES, table="metadata")
+    return _metadata_cache
+
+def metadata_cache_key(service: str, paper_id: str) -> str:
+    return f"{service}:{paper_id.strip().lower()}"
+
+def get_cached_metadata(service: str, paper_ids: List[str]) -> dict:
+    """{paper id: metadata, or None for a cached miss} for the ids in the cache.
+    This and cache_metadata block on SQLite, so handlers call them in the threadpool."""
+    keys = {paper_id: metadata_cache_key(service, paper_id) for paper_id in paper_ids}
+    cached = get_metadata_cache().get_many(keys.values())
+    return {paper_id: json.loads(cached[key]) for paper_id, key in keys.items() if key in cached}
+
+def cache_metadata(service: str, results: dict):
+    """Store {paper id: metadata or None}; None records a lookup that found nothing."""
+    found = [(metadata_cache_key(service, i), json.dumps(m).encode()) for i, m in results.items() if m]
+    missing = [(metadata_cache_key(service, i), b"null") for i, m in results.items() if not m]
+    get_metadata_cache().set_many(found, ttl=METADATA_CACHE_TTL)
+    get_metadata_cache().set_many(missing, ttl=METADATA_CACHE_NEGATIVE_TTL)
+
+ARXIV_NS = {'atom': 'http://www.w3.org/2005/Atom'}
+
+def parse_arxiv_entry(entry) -> dict:
+    title_elem = entry.find('atom:title', ARXIV_NS)
+    abstract_elem = entry.find('atom:summary', ARXIV_NS)
+    authors = entry.findall('atom:author/atom:name', ARXIV_NS)
+    published = entry.find('atom:published', ARXIV_NS)
+    
+    title = title_elem.text.strip().replace('\n', ' ') if title_elem is not None and title_elem.text else None
+    abstract = abstract_elem.text.strip().replace('\n', ' ') if abstract_elem is not None and abstract_elem.text else None
+    
+    return {
+        'title': title,
+        'abstract': abstract,
+        'authors': ', '.join([a.text for a in authors if a.text]) if authors else None,
+        'year': int(published.text[:4]) if published is not None and published.text else None
+    }
+
 async def fetch_arxiv_metadata(arxiv_id: str) -> dict:
+    cached = await run_in_threadpool(get_cached_metadata, "arxiv", [arxiv_id])
+    if arxiv_id in cached:
+        return cached[arxiv_id] or {}
+    if METADATA_CACHE_OFFLINE:
+        print(f"arXiv metadata for {arxiv_id} not cached (offline)")
+        return {}
+    
     url = f"http://export.arxiv.org/api/query?id_list={arxiv_id}"
     print(f"Fetching arXiv metadata for: {arxiv_id}")
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with http_client("arxiv") as client:
             response = await client.get(url)
             print(f"arXiv response status: {response.status_code}")
             if response.status_code == 200:
-                import xml.etree.ElementTree as ET
                 root = ET.fromstring(response.text)
-                ns = {'atom': 'http://www.w3.org/2005/Atom'}
-                entry = root.find('atom:entry', ns)
+                entry = root.find('atom:entry', ARXIV_NS)
                 if entry:
-                    title_elem = entry.find('atom:title', ns)
-                    abstract_elem = entry.find('atom:summary', ns)
-                    authors = entry.findall('atom:author/atom:name', ns)
-                    published = entry.find('atom:published', ns)
-                    
-                    title = title_elem.text.strip().replace('\n', ' ') if title_elem is not None and title_elem.text else None
-                    abstract = abstract_elem.text.strip().replace('\n', ' ') if abstract_elem is not None and abstract_elem.text else None
-                    
-                    result = {
-                        'title': title,
-                        'abstract': abstract,
-                        'authors': ', '.join([a.text for a in authors if a.text]) if authors else None,
-                        'year': int(published.text[:4]) if published is not None and published.text else None
-                    }
+                    result = parse_arxiv_entry(entry)
                     print(f"arXiv metadata fetched: {result.get('title', 'No title')[:50]}")
+                    await run_in_threadpool(cache_metadata, "arxiv", {arxiv_id: result})
                     return result
                 else:
                     print("No entry found in arXiv response")
+                    await run_in_threadpool(cache_metadata, "arxiv", {arxiv_id: None})
     except Exception as e:
         print(f"Error fetching arXiv metadata: {e}")
     return {}
 
 async def fetch_semantic_scholar_metadata(doi: str) -> dict:
+    cached = await run_in_threadpool(get_cached_metadata, "semantic_scholar", [doi])
+    if doi in cached:
+        return cached[doi] or {}
+    if METADATA_CACHE_OFFLINE:
+        print(f"Semantic Scholar metadata for {doi} not cached (offline)")
+        return {}
+    
     url = f"https://api.semanticscholar.org/graph/v1/paper/{doi}?fields=title,abstract,authors,year"
-    async with httpx.AsyncClient() as client:
+    async with http_client("semantic_scholar") as client:
         response = await client.get(url)
         if response.status_code == 200:
             data = response.json()
             authors = data.get('authors', [])
-            return {
+            result = {
                 'title': data.get('title'),
                 'abstract': data.get('abstract'),
                 'authors': ', '.join([a.get('name', '') for a in authors]) if authors else None,
                 'year': data.get('year')
             }
+            await run_in_threadpool(cache_metadata, "semantic_scholar", {doi: result})
+            return result
+        if response.status_code == 404:
+            await run_in_threadpool(cache_metadata, "semantic_scholar", {doi: None})
     return {}
 
-def clean_abstract_text(text: str) -> str:
-    """Thoroughly clean up extracted abstract text."""
-    import re
-    
-    if not text:
-        return ""
-    
-    # Remove arXiv identifiers and dates
-    text = re.sub(r'arXiv:[^\s]+', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}', '', text, flags=re.IGNORECASE)
-    
-    # Remove email addresses
-    text = re.sub(r'[\w\.-]+@[\w\.-]+\.\w+', '', text)
-    
-    # Remove section markers like "§"
-    text = re.sub(r'§[^\s]*', '', text)
-    
-    # Remove "Contents" section and everything after
-    contents_match = re.search(r'\bcontents\b', text, re.IGNORECASE)
-    if contents_match:
-        text = text[:contents_match.start()]
-    
-    # Remove numbered sections like "1 Introduction", "2.1 Methods"
-    text = re.sub(r'\n\s*\d+\.?\d*\s+[A-Z][a-z]+.*', '', text)
-    
-    # Remove page numbers
-    text = re.sub(r'\b\d+\s*$', '', text, flags=re.MULTILINE)
-    
-    # Remove institution/address lines (contain "University", "Institut", postal codes)
-    lines = text.split('\n')
-    cleaned_lines = []
-    for line in lines:
-        line_stripped = line.strip()
-        # Skip lines that look like addresses or affiliations
-        if re.search(r'(University|Institut|Department|Postfach|D-\d{5}|\d{5}\s+[A-Z])', line_stripped, re.IGNORECASE):
-            continue
-        # Skip lines that are just author names (short, title case, possibly with commas)
-        if len(line_stripped) < 50 and re.match(r'^[A-Z][a-z]+(\s+[A-Z]\.?\s*)*[A-Z][a-z]+\s*,?$', line_stripped):
-            continue
-        # Skip lines with "correspondence" or "address"
-        if re.search(r'(correspondence|address|email)', line_stripped, re.IGNORECASE):
-            continue
-        cleaned_lines.append(line)
-    text = '\n'.join(cleaned_lines)
-    
-    # Fix hyphenated words split across lines (e.g., "inter-\nest" -> "interest")
-    text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', text)
-    
-    # Fix spacing issues from PDF extraction
-    # Remove single character followed by space that's likely a broken word
-    text = re.sub(r'\b([a-z])\s+([a-z]{1,2})\s+([a-z])', r'\1\2\3', text)
-    
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove any remaining "Abstract." or "Abstract:" at the start
-    text = re.sub(r'^abstract[\s.:]+', '', text, flags=re.IGNORECASE)
-    
-    # Trim and clean up
-    text = text.strip()
-    
-    # Remove trailing incomplete sentences (end mid-word or with weird chars)
-    if text and not text[-1] in '.!?"\'':
-        # Find last complete sentence
-        last_period = text.rfind('.')
-        if last_period > len(text) * 0.5:  # Only trim if we're keeping most of it
-            text = text[:last_period + 1]
-    
-    return text
+# Bulk import: ids per metadata request and items per import
+ARXIV_BATCH_SIZE = int(os.getenv("ARXIV_BATCH_SIZE", "50"))
+SEMANTIC_SCHOLAR_BATCH_SIZE = int(os.getenv("SEMANTIC_SCHOLAR_BATCH_SIZE", "100"))
+BULK_IMPORT_MAX_ITEMS = int(os.getenv("BULK_IMPORT_MAX_ITEMS", "500"))
 
-def extract_abstract_from_text(text: str) -> str:
-    """Extract ONLY the abstract section from paper text."""
-    import re
-    
-    if not text:
-        return None
-    
-    # Find where "Abstract" starts
-    abstract_match = re.search(r'\babstract\b[\s.:]*', text, re.IGNORECASE)
-    
-    if not abstract_match:
-        return None
-    
-    # Start right after "Abstract"
-    start_pos = abstract_match.end()
-    
-    # Find where abstract ends - look for common section headers
-    remaining_text = text[start_pos:]
-    
-    end_markers = [
-        r'\b(introduction|keywords|key\s*words|contents|1\s+introduction|1\.\s*introduction|i\.\s*introduction)\b',
-        r'\n\s*\d+\s*\n',  # Page numbers
-        r'\bCONTENTS\b',
-        r'\n\s*1\s+[A-Z]',  # Section 1 starting
-    ]
-    
-    end_pos = len(remaining_text)
-    for marker in end_markers:
-        match = re.search(marker, remaining_text, re.IGNORECASE)
-        if match and match.start() < end_pos:
-            end_pos = match.start()
-    
-    abstract = remaining_text[:end_pos]
-    
-    # Clean it up
-    abstract = clean_abstract_text(abstract)
-    
-    # If abstract is too short, it probably failed
-    if len(abstract) < 100:
-        return None
-    
-    # If abstract is too long, truncate at a sentence boundary
-    if len(abstract) > 2000:
-        # Find a good breaking point
-        truncated = abstract[:2000]
-        last_period = truncated.rfind('.')
-        if last_period > 1000:
-            abstract = truncated[:last_period + 1]
-        else:
-            abstract = truncated
-    
-    return abstract
+ARXIV_ID_PATTERN = re.compile(r'^(\d{4}\.\d{4,5}|[a-z-]+(\.[a-z]{2})?/\d{7})(v\d+)?$', re.IGNORECASE)
+DOI_PATTERN = re.compile(r'^10\.\d{4,9}/\S+$')
 
-def extract_title_from_text(text: str) -> str:
-    """Extract the paper title from the text."""
-    import re
-    
-    if not text:
-        return None
-    
-    lines = text.strip().split('\n')
-    
-    for line in lines[:15]:  # Check first 15 lines
-        line = line.strip()
-        
-        # Skip empty lines
-        if not line:
-            continue
-        
-        # Skip arXiv identifiers
-        if re.match(r'^arXiv:', line, re.IGNORECASE):
-            continue
-        
-        # Skip dates
-        if re.match(r'^\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)', line, re.IGNORECASE):
-            continue
-        
-        # Skip lines with email
-        if '@' in line:
-            continue
-        
-        # Skip very short lines
-        if len(line) < 10:
-            continue
-        
-        # Skip lines that look like author names (short, mostly proper nouns)
-        if len(line) < 40 and re.match(r'^[A-Z][a-z]+\s+[A-Z]', line):
-            words = line.split()
-            if len(words) <= 4:
-                continue
-        
-        # Skip institution lines
-        if re.search(r'(University|Institut|Department)', line, re.IGNORECASE):
-            continue
-        
-        # Skip lines starting with section markers
-        if line.startswith('§'):
-            continue
-        
-        # This looks like a title!
-        # Clean it up
-        title = re.sub(r'\s+', ' ', line).strip()
-        return title
-    
-    return None
+def arxiv_base_id(arxiv_id: str) -> str:
+    """Strip the version suffix, so 2101.00001v2 and 2101.00001 compare equal."""
+    return re.sub(r'v\d+$', '', arxiv_id)
 
-def extract_text_from_pdf(file_content: bytes) -> dict:
-    """Extract title and abstract from PDF."""
-    try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        
-        # Extract text from first 2 pages (abstract is usually on first page)
-        full_text = ""
-        for page in pdf_reader.pages[:2]:
-            page_text = page.extract_text() or ""
-            full_text += page_text + "\n"
-        
-        if not full_text.strip():
-            return {"title": None, "abstract": None}
-        
-        # Extract title and abstract
-        title = extract_title_from_text(full_text)
-        abstract = extract_abstract_from_text(full_text)
-        
-        print(f"Extracted title: {title[:50] if title else 'None'}...")
-        print(f"Extracted abstract length: {len(abstract) if abstract else 0}")
-        
-        return {
-            "title": title,
-            "abstract": abstract
-        }
-    except Exception as e:
-        print(f"PDF extraction error: {e}")
-        return {"title": None, "abstract": None}
+def postgrest_quote(value: str) -> str:
+    """Double-quote a value for a PostgREST or=(...) filter, where , . : ( ) are reserved."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def classify_import_item(value: str, input_type: Optional[str] = None):
+    """Return ("arxiv" | "doi", normalized id), or (None, value) if it's neither."""
+    value = value.strip()
+    if input_type in (None, "doi"):
+        doi = extract_doi(value)
+        if DOI_PATTERN.match(doi):
+            return "doi", doi
+    if input_type in (None, "arxiv"):
+        arxiv_id = extract_arxiv_id(value)
+        if ARXIV_ID_PATTERN.match(arxiv_id):
+            return "arxiv", arxiv_id
+    return None, value
+
+async def fetch_arxiv_metadata_batch(client: httpx.AsyncClient, arxiv_ids: List[str]) -> dict:
+    """Fetch many papers with one comma-separated id_list query.
+    Returns {base arXiv id: metadata} for the entries arXiv found."""
+    params = {"id_list": ",".join(arxiv_ids), "max_results": len(arxiv_ids)}
+    response = await client.get("http://export.arxiv.org/api/query", params=params)
+    response.raise_for_status()
+    
+    found = {}
+    root = ET.fromstring(response.text)
+    for entry in root.findall('atom:entry', ARXIV_NS):
+        id_elem = entry.find('atom:id', ARXIV_NS)
+        match = re.search(r'arxiv\.org/abs/(.+)$', id_elem.text.strip()) if id_elem is not None and id_elem.text else None
+        if match:
+            found[arxiv_base_id(match.group(1))] = parse_arxiv_entry(entry)
+    return found
+
+async def fetch_semantic_scholar_metadata_batch(client: httpx.AsyncClient, dois: List[str]) -> dict:
+    """Fetch many papers with one Semantic Scholar batch request. Returns {doi: metadata}."""
+    response = await client.post(
+        "https://api.semanticscholar.org/graph/v1/paper/batch",
+        params={"fields": "title,abstract,authors,year"},
+        json={"ids": [f"DOI:{doi}" for doi in dois]},
+    )
+    response.raise_for_status()
+    
+    found = {}
+    # Results line up with the requested ids; unknown ids come back as null
+    for doi, data in zip(dois, response.json()):
+        if data:
+            authors = data.get('authors', [])
+            found[doi] = {
+                'title': data.get('title'),
+                'abstract': data.get('abstract'),
+                'authors': ', '.join([a.get('name', '') for a in authors]) if authors else None,
+                'year': data.get('year')
+            }
+    return found
+
+async def fetch_metadata_in_batches(ids: List[str], fetch_batch, batch_size: int, service: str, found_key=lambda i: i):
+    """Resolve `ids` from the metadata cache, fetching the rest in chunks within the
+    service's concurrency limit. `found_key` maps a requested id to the fetcher's key.
+    Returns {id: metadata or None if not found} and {id: error} for ids that failed."""
+    resolved = await run_in_threadpool(get_cached_metadata, service, ids)
+    missing = [i for i in ids if i not in resolved]
+    if not missing:
+        return resolved, {}
+    if METADATA_CACHE_OFFLINE:
+        return resolved, {i: "Not in metadata cache (offline)" for i in missing}
+    
+    async def run(chunk):
+        try:
+            async with http_client(service) as client:
+                return await fetch_batch(client, chunk), None
+        except Exception as e:
+            print(f"✗ Metadata batch of {len(chunk)} failed: {e}")
+            return {}, str(e)
+    
+    chunks = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+    fetched, errors = {}, {}
+    for chunk, (found, error) in zip(chunks, await asyncio.gather(*(run(c) for c in chunks))):
+        if error:
+            errors.update({i: error for i in chunk})
+        else:
+            fetched.update({i: found.get(found_key(i)) for i in chunk})
+    await run_in_threadpool(cache_metadata, service, fetched)
+    resolved.update(fetched)
+    return resolved, errors
 
 @router.get("/{project_id}")
-async def list_papers(project_id: str, authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+async def list_papers(
+    project_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated columns; embeddings are excluded unless listed"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; omit to return every paper"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    authorization: str = Header(None)
+):
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
     try:
         # Verify project belongs to user
-        project = supabase.table("projects").select("id").eq("id", project_id).eq("user_id", user.id).execute()
-        if not project.data or len(project.data) == 0:
-            raise HTTPException(status_code=404, detail="Project not found")
+        await verify_project_ownership(supabase, user.id, project_id)
         
-        response = supabase.table("papers").select("*").eq("project_id", project_id).order("created_at", desc=True).execute()
-        return {"papers": response.data}
+        columns = parse_paper_fields(fields)
+        papers, next_cursor = await fetch_papers_page(supabase, project_id, columns, limit, cursor)
+        return {"papers": papers, "next_cursor": next_cursor}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{project_id}/stream")
+async def stream_papers(
+    project_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated columns; embeddings are excluded unless listed"),
+    page_size: int = Query(STREAM_PAGE_SIZE, ge=1, le=1000),
+    authorization: str = Header(None)
+):
+    """Stream a project's papers as NDJSON, one paper per line, a page at a time."""
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
+    await verify_project_ownership(supabase, user.id, project_id)
+    columns = parse_paper_fields(fields)
+    
+    async def generate():
+        cursor = None
+        while True:
+            papers, cursor = await fetch_papers_page(supabase, project_id, columns, page_size, cursor)
+            for paper in papers:
+                yield json.dumps(paper) + "\n"
+            if cursor is None:
+                break
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @router.post("/upload")
 async def upload_paper(
     project_id: str = Form(...),
@@ -345,13 +416,11 @@ async def upload_paper(
     file: Optional[UploadFile] = File(None),
     authorization: str = Header(None)
 ):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
     # Verify project belongs to user
-    project = supabase.table("projects").select("id").eq("id", project_id).eq("user_id", user.id).execute()
-    if not project.data or len(project.data) == 0:
-        raise HTTPException(status_code=404, detail="Project not found")
+    await verify_project_ownership(supabase, user.id, project_id)
     
     paper_data = {
         "project_id": project_id,
@@ -386,7 +455,7 @@ async def upload_paper(
         
         elif input_type == "pdf" and file:
             content = await file.read()
-            extracted = extract_text_from_pdf(content)
+            extracted = await run_cpu_bound(extract_text_from_pdf, content)
             
             # Use extracted title if no title provided, fallback to filename
             extracted_title = extracted.get("title")
@@ -404,20 +473,325 @@ async def upload_paper(
         if not paper_data.get("title"):
             paper_data["title"] = "Untitled Paper"
         
-        response = supabase.table("papers").insert(paper_data).execute()
-        return {"paper": response.data[0]}
+        # Reuse an embedding computed for the same text earlier (e.g. same paper in another project)
+        cached_embedding = await run_in_threadpool(get_cached_embedding, paper_embedding_text(paper_data))
+        if cached_embedding:
+            paper_data.update(embedding_fields(cached_embedding))
+        
+        response = await supabase.table("papers").insert(paper_data).execute()
+        index_papers(project_id, response.data)
+        return {"paper": paper_summary(response.data[0])}
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class BulkImportRequest(BaseModel):
+    project_id: str
+    items: List[str]
+    input_type: Optional[str] = None  # 'arxiv', 'doi', or None to detect per item
+
+@router.post("/import")
+async def import_papers(request: BulkImportRequest, authorization: str = Header(None)):
+    """Import a list of arXiv ids and DOIs (or their URLs) in one request.
+    
+    Metadata is fetched in batched calls over the shared clients and all new papers
+    are written with a single insert. Each item gets a status: imported, exists,
+    duplicate, invalid, not_found or failed.
+    """
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
+    
+    if request.input_type not in (None, "arxiv", "doi"):
+        raise HTTPException(status_code=400, detail="input_type must be 'arxiv' or 'doi'")
+    if len(request.items) > BULK_IMPORT_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_IMPORT_MAX_ITEMS} items per import")
+    
+    # Verify project belongs to user
+    await verify_project_ownership(supabase, user.id, request.project_id)
+    
+    results = []
+    seen = set()
+    for value in request.items:
+        kind, paper_id = classify_import_item(value, request.input_type)
+        result = {"input": value, "type": kind, "id": paper_id}
+        key = (kind, arxiv_base_id(paper_id) if kind == "arxiv" else paper_id.lower())
+        if kind is None:
+            result["status"] = "invalid"
+        elif key in seen:
+            result["status"] = "duplicate"
+        else:
+            seen.add(key)
+            result["status"] = "pending"
+        results.append(result)
+    
+    pending = [r for r in results if r["status"] == "pending"]
+    arxiv_ids = [r["id"] for r in pending if r["type"] == "arxiv"]
+    dois = [r["id"] for r in pending if r["type"] == "doi"]
+    
+    try:
+        # Skip papers the project already has, under any arXiv version or DOI case.
+        # like/ilike can over-match (DOIs may contain _ or %), so the rows that
+        # come back are compared on the normalized id again here.
+        # Chunked, since the filter goes in the URL.
+        existing = set()
+        for start in range(0, len(arxiv_ids), ID_FILTER_CHUNK_SIZE):
+            response = await supabase.table("papers").select("arxiv_id").eq("project_id", request.project_id).or_(
+                ",".join(f"arxiv_id.like.{postgrest_quote(arxiv_base_id(i) + '*')}" for i in arxiv_ids[start:start + ID_FILTER_CHUNK_SIZE])
+            ).execute()
+            existing.update(("arxiv", arxiv_base_id(row["arxiv_id"])) for row in response.data)
+        for start in range(0, len(dois), ID_FILTER_CHUNK_SIZE):
+            response = await supabase.table("papers").select("doi").eq("project_id", request.project_id).or_(
+                ",".join(f"doi.ilike.{postgrest_quote(doi)}" for doi in dois[start:start + ID_FILTER_CHUNK_SIZE])
+            ).execute()
+            existing.update(("doi", row["doi"].lower()) for row in response.data)
+        for r in pending:
+            if (r["type"], arxiv_base_id(r["id"]) if r["type"] == "arxiv" else r["id"].lower()) in existing:
+                r["status"] = "exists"
+        pending = [r for r in pending if r["status"] == "pending"]
+        
+        (arxiv_found, arxiv_errors), (doi_found, doi_errors) = await asyncio.gather(
+            fetch_metadata_in_batches([r["id"] for r in pending if r["type"] == "arxiv"], fetch_arxiv_metadata_batch, ARXIV_BATCH_SIZE, "arxiv", arxiv_base_id),
+            fetch_metadata_in_batches([r["id"] for r in pending if r["type"] == "doi"], fetch_semantic_scholar_metadata_batch, SEMANTIC_SCHOLAR_BATCH_SIZE, "semantic_scholar"),
+        )
+        
+        rows = []
+        to_insert = []
+        for r in pending:
+            if r["type"] == "arxiv":
+                metadata, error = arxiv_found.get(r["id"]), arxiv_errors.get(r["id"])
+            else:
+                metadata, error = doi_found.get(r["id"]), doi_errors.get(r["id"])
+            if error:
+                r.update(status="failed", error=error)
+                continue
+            if not metadata or not metadata.get("title"):
+                r["status"] = "not_found"
+                continue
+            
+            paper_data = {
+                "project_id": request.project_id,
+                "title": metadata["title"],
+                "abstract": metadata.get("abstract"),
+                "authors": metadata.get("authors"),
+                "year": metadata.get("year"),
+                "arxiv_id": r["id"] if r["type"] == "arxiv" else None,
+                "doi": r["id"] if r["type"] == "doi" else None,
+            }
+            rows.append(paper_data)
+            to_insert.append(r)
+        
+        # Every row carries the same keys, as PostgREST expects for a bulk insert
+        cached_embeddings = await run_in_threadpool(get_cached_embeddings, [paper_embedding_text(row) for row in rows])
+        for paper_data, cached_embedding in zip(rows, cached_embeddings):
+            paper_data.update(embedding_fields(cached_embedding))
+        
+        if rows:
+            response = await supabase.table("papers").insert(rows).execute()
+            index_papers(request.project_id, response.data)
+            for r, row in zip(to_insert, response.data):
+                r.update(status="imported", paper=paper_summary(row))
+        
+        imported = len(to_insert)
+        print(f"✓ Imported {imported}/{len(request.items)} papers into project {request.project_id}")
+        return {"imported": imported, "results": results}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Batch PDF upload: per-file size cap, files per request, and how rows are grouped into inserts
+PDF_UPLOAD_MAX_BYTES = int(os.getenv("PDF_UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+PDF_BATCH_MAX_FILES = int(os.getenv("PDF_BATCH_MAX_FILES", "200"))
+PDF_INSERT_BATCH_SIZE = int(os.getenv("PDF_INSERT_BATCH_SIZE", "10"))
+PDF_INSERT_MAX_DELAY = float(os.getenv("PDF_INSERT_MAX_DELAY", "1.0"))
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+def copy_upload(source, path: str, max_bytes: int) -> bool:
+    """Copy a file object to `path` in chunks; False (and a partial file) if it is larger than max_bytes."""
+    size = 0
+    with open(path, "wb") as out:
+        while True:
+            chunk = source.read(SPOOL_CHUNK_SIZE)
+            if not chunk:
+                return True
+            size += len(chunk)
+            if size > max_bytes:
+                return False
+            out.write(chunk)
+
+async def spool_upload(file: UploadFile, directory: str, max_bytes: int) -> Optional[str]:
+    """Copy an upload to a file in `directory`, in the threadpool. Returns the path,
+    or None if the upload is larger than max_bytes."""
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory)
+    os.close(fd)
+    try:
+        fits = await run_in_threadpool(copy_upload, file.file, path, max_bytes)
+    finally:
+        await file.close()
+    if not fits:
+        os.remove(path)
+        return None
+    return path
+
+def pdf_paper_row(project_id: str, filename: str, extracted: dict) -> dict:
+    title = extracted.get("title") or filename.replace('.pdf', '').replace('_', ' ')
+    paper_data = {
+        "project_id": project_id,
+        "title": title or "Untitled Paper",
+        "abstract": extracted.get("abstract")
+    }
+    # Every row carries the same keys, as PostgREST expects for a bulk insert
+    paper_data.update(embedding_fields(get_cached_embedding(paper_embedding_text(paper_data))))
+    return paper_data
+
+@router.post("/upload/batch")
+async def upload_papers_batch(
+    project_id: str = Form(...),
+    files: List[UploadFile] = File(...),
+    authorization: str = Header(None)
+):
+    """Upload many PDFs at once and stream one NDJSON result line per file.
+    
+    Files are spooled to disk (each capped at PDF_UPLOAD_MAX_BYTES), parsed in the
+    process pool, and inserted in batches as extraction finishes. The last line
+    summarizes the whole upload.
+    """
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
+    
+    # Verify project belongs to user
+    await verify_project_ownership(supabase, user.id, project_id)
+    
+    if len(files) > PDF_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {PDF_BATCH_MAX_FILES} files per upload")
+    
+    # Spool before responding: the uploads are closed once the endpoint returns
+    spool_dir = tempfile.mkdtemp(prefix="pdf-upload-")
+    spooled = []
+    early_results = []
+    try:
+        for file in files:
+            filename = file.filename or "upload.pdf"
+            path = await spool_upload(file, spool_dir, PDF_UPLOAD_MAX_BYTES)
+            if path is None:
+                early_results.append({"filename": filename, "status": "too_large",
+                                      "error": f"File is larger than {PDF_UPLOAD_MAX_BYTES / (1024 * 1024):g} MB"})
+            else:
+                spooled.append((filename, path))
+    except BaseException:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+        raise
     
+    async def generate():
+        counts = {"imported": 0, "failed": len(early_results)}
+        pending = set()
+        try:
+            for result in early_results:
+                yield json.dumps(result) + "\n"
+            
+            tasks = {
+                asyncio.ensure_future(run_in_process(extract_text_from_pdf_file, path)): filename
+                for filename, path in spooled
+            }
+            pending = set(tasks)
+            batch = []
+            batch_started = None
+            
+            while pending or batch:
+                if pending:
+                    done, pending = await asyncio.wait(pending, timeout=PDF_INSERT_MAX_DELAY, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        filename = tasks[task]
+                        try:
+                            row = await run_in_threadpool(pdf_paper_row, project_id, filename, task.result())
+                            batch.append((filename, row))
+                            batch_started = batch_started or time.monotonic()
+                        except Exception as e:
+                            counts["failed"] += 1
+                            yield json.dumps({"filename": filename, "status": "failed", "error": str(e)}) + "\n"
+                
+                flush = batch and (
+                    not pending
+                    or len(batch) >= PDF_INSERT_BATCH_SIZE
+                    or time.monotonic() - batch_started >= PDF_INSERT_MAX_DELAY
+                )
+                if not flush:
+                    continue
+                
+                try:
+                    response = await supabase.table("papers").insert([row for _, row in batch]).execute()
+                    index_papers(project_id, response.data)
+                    for (filename, _), row in zip(batch, response.data):
+                        counts["imported"] += 1
+                        yield json.dumps({"filename": filename, "status": "imported", "paper": paper_summary(row)}) + "\n"
+                except Exception as e:
+                    print(f"✗ Insert of {len(batch)} uploaded papers failed: {e}")
+                    for filename, _ in batch:
+                        counts["failed"] += 1
+                        yield json.dumps({"filename": filename, "status": "failed", "error": str(e)}) + "\n"
+                batch = []
+                batch_started = None
+            
+            print(f"✓ Batch upload: {counts['imported']}/{len(files)} PDFs imported into project {project_id}")
+            yield json.dumps({"done": True, "files": len(files), **counts}) + "\n"
+        finally:
+            # The client may have gone away mid-stream
+            for task in pending:
+                task.cancel()
+            shutil.rmtree(spool_dir, ignore_errors=True)
+    
+    response = StreamingResponse(generate(), media_type="application/x-ndjson")
+    # generate() removes the directory when it finishes, but never runs at all if
+    # the client is gone before the body starts; the response going away covers that
+    weakref.finalize(response, shutil.rmtree, spool_dir, ignore_errors=True)
+    return response
+
+@router.get("/{paper_id}/similar")
+async def similar_papers(
+    paper_id: str,
+    k: int = Query(10, ge=1, le=100),
+    authorization: str = Header(None)
+):
+    """The k papers in the same project closest to this one by embedding cosine
+    similarity, best first. Searches the project's in-memory index, which is
+    loaded on first use and kept up to date by uploads and deletes."""
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
+
+    try:
+        paper = await supabase.table("papers").select("id, project_id, projects(user_id)").eq("id", paper_id).execute()
+        if not paper.data or paper.data[0].get('projects', {}).get('user_id') != user.id:
+            raise HTTPException(status_code=404, detail="Paper not found")
+
+        index = await get_project_index(supabase, paper.data[0]['project_id'])
+        neighbours = await run_cpu_bound(index.search, paper_id, k)
+        if neighbours is None:
+            raise HTTPException(status_code=409, detail="Paper has no embedding yet - run clustering first")
+
+        papers = {}
+        if neighbours:
+            response = await supabase.table("papers").select(",".join(PAPER_SUMMARY_FIELDS)).in_(
+                "id", [similar_id for similar_id, _ in neighbours]
+            ).execute()
+            papers = {row['id']: row for row in response.data}
+        # A paper deleted since the search is skipped
+        similar = [{**papers[similar_id], "similarity": round(score, 4)}
+                   for similar_id, score in neighbours if similar_id in papers]
+        return {"paper_id": paper_id, "k": k, "index": index.kind, "papers": similar}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{paper_id}")
 async def delete_paper(paper_id: str, authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
     try:
         # Get paper and verify ownership through project
-        paper = supabase.table("papers").select("*, projects(user_id)").eq("id", paper_id).execute()
+        paper = await supabase.table("papers").select("id, project_id, projects(user_id)").eq("id", paper_id).execute()
         if not paper.data or len(paper.data) == 0:
             raise HTTPException(status_code=404, detail="Paper not found")
         
@@ -425,7 +799,8 @@ async def delete_paper(paper_id: str, authorization: str = Header(None)):
         if paper_data.get('projects', {}).get('user_id') != user.id:
             raise HTTPException(status_code=404, detail="Paper not found")
         
-        supabase.table("papers").delete().eq("id", paper_id).execute()
+        await supabase.table("papers").delete().eq("id", paper_id).execute()
+        unindex_papers(paper_data['project_id'], [paper_id])
         return {"message": "Paper deleted successfully"}
     except HTTPException:
         raise
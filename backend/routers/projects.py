@@ -4,9 +4,29 @@ from typing import Optional, List
 from datetime import datetime
 from database import get_supabase
 from routers.auth import get_current_user
+from cache import TTLCache
+from vector_index import drop_project_index
+import os
 
 router = APIRouter()
 
+# Confirmed (user_id, project_id) ownership, shared by the papers and clustering
+# routers. Entries are per process, so keep the TTL short.
+OWNERSHIP_CACHE_TTL = float(os.getenv("OWNERSHIP_CACHE_TTL", "60"))
+_ownership_cache = TTLCache(int(os.getenv("OWNERSHIP_CACHE_MAX_ENTRIES", "10000")), OWNERSHIP_CACHE_TTL)
+
+async def verify_project_ownership(supabase, user_id: str, project_id: str):
+    """Raise 404 unless the project belongs to the user. Positive answers are cached."""
+    if _ownership_cache.get((user_id, project_id)):
+        return
+    project = await supabase.table("projects").select("id").eq("id", project_id).eq("user_id", user_id).execute()
+    if not project.data or len(project.data) == 0:
+        raise HTTPException(status_code=404, detail="Project not found")
+    _ownership_cache.set((user_id, project_id), True)
+
+def invalidate_project_ownership(user_id: str, project_id: str):
+    _ownership_cache.pop((user_id, project_id))
+
 class ProjectCreate(BaseModel):
     name: str
     description: Optional[str] = None
@@ -24,19 +44,19 @@ class ProjectResponse(BaseModel):
 
 @router.get("")
 async def list_projects(authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
     try:
-        response = supabase.table("projects").select("*").eq("user_id", user.id).order("created_at", desc=True).execute()
+        response = await supabase.table("projects").select("*").eq("user_id", user.id).order("created_at", desc=True).execute()
         return {"projects": response.data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("")
 async def create_project(project: ProjectCreate, authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
     try:
         data = {
@@ -44,18 +64,19 @@ async def create_project(project: ProjectCreate, authorization: str = Header(Non
             "name": project.name,
             "description": project.description
         }
-        response = supabase.table("projects").insert(data).execute()
+        response = await supabase.table("projects").insert(data).execute()
+        invalidate_project_ownership(user.id, response.data[0]["id"])
         return {"project": response.data[0]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{project_id}")
 async def get_project(project_id: str, authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
     try:
-        response = supabase.table("projects").select("*").eq("id", project_id).eq("user_id", user.id).execute()
+        response = await supabase.table("projects").select("*").eq("id", project_id).eq("user_id", user.id).execute()
         if not response.data or len(response.data) == 0:
             raise HTTPException(status_code=404, detail="Project not found")
         return {"project": response.data[0]}
@@ -66,8 +87,8 @@ async def get_project(project_id: str, authorization: str = Header(None)):
 
 @router.put("/{project_id}")
 async def update_project(project_id: str, project: ProjectUpdate, authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
     try:
         update_data = {}
@@ -76,7 +97,7 @@ async def update_project(project_id: str, project: ProjectUpdate, authorization:
         if project.description is not None:
             update_data["description"] = project.description
         
-        response = supabase.table("projects").update(update_data).eq("id", project_id).eq("user_id", user.id).execute()
+        response = await supabase.table("projects").update(update_data).eq("id", project_id).eq("user_id", user.id).execute()
         if not response.data:
             raise HTTPException(status_code=404, detail="Project not found")
         return {"project": response.data[0]}
@@ -85,14 +106,16 @@ async def update_project(project_id: str, project: ProjectUpdate, authorization:
 
 @router.delete("/{project_id}")
 async def delete_project(project_id: str, authorization: str = Header(None)):
-    user = get_current_user(authorization)
-    supabase = get_supabase()
+    user = await get_current_user(authorization)
+    supabase = await get_supabase()
     
+    invalidate_project_ownership(user.id, project_id)
+    drop_project_index(project_id)
     try:
         # Delete associated papers first
-        supabase.table("papers").delete().eq("project_id", project_id).execute()
+        await supabase.table("papers").delete().eq("project_id", project_id).execute()
         # Delete the project
-        response = supabase.table("projects").delete().eq("id", project_id).eq("user_id", user.id).execute()
+        response = await supabase.table("projects").delete().eq("id", project_id).eq("user_id", user.id).execute()
         return {"message": "Project deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -5,6 +5,7 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
 -- Drop tables in reverse order of dependencies
+DROP TABLE IF EXISTS cluster_models;
 DROP TABLE IF EXISTS clusters;
 DROP TABLE IF EXISTS papers;
 DROP TABLE IF EXISTS projects;
@@ -31,7 +32,11 @@ CREATE TABLE papers (
     year INTEGER,
     file_url TEXT,
     embedding FLOAT8[],
+    -- float16 or int8 embedding as base64, used instead of embedding when EMBEDDING_STORAGE is set
+    embedding_packed TEXT,
     cluster_id INTEGER,
+    layout_x FLOAT8,
+    layout_y FLOAT8,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -43,12 +48,34 @@ CREATE TABLE clusters (
     cluster_number INTEGER NOT NULL,
     label VARCHAR(255),
     summary TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    centroid FLOAT8[],
+    size INTEGER NOT NULL DEFAULT 0,
+    member_version TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (project_id, cluster_number)
+);
+
+-- Fitted state of the last full clustering, used to assign new papers incrementally
+CREATE TABLE cluster_models (
+    project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    n_clusters INTEGER NOT NULL,
+    vocabulary JSONB NOT NULL DEFAULT '{}',
+    idf FLOAT8[] NOT NULL DEFAULT '{}',
+    mean_distance FLOAT8 NOT NULL,
+    n_papers INTEGER NOT NULL,
+    n_assigned_since_fit INTEGER NOT NULL DEFAULT 0,
+    layout_version TEXT,
+    layout_projection JSONB,
+    graph_neighbors INTEGER,
+    graph_edges JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- Create indexes
 CREATE INDEX idx_projects_user_id ON projects(user_id);
 CREATE INDEX idx_papers_project_id ON papers(project_id);
+CREATE INDEX idx_papers_project_created ON papers(project_id, created_at DESC, id DESC);
 CREATE INDEX idx_papers_cluster_id ON papers(cluster_id);
 CREATE INDEX idx_clusters_project_id ON clusters(project_id);
 
@@ -56,3 +83,4 @@ CREATE INDEX idx_clusters_project_id ON clusters(project_id);
 ALTER TABLE projects ENABLE ROW LEVEL SECURITY;
 ALTER TABLE papers ENABLE ROW LEVEL SECURITY;
 ALTER TABLE clusters ENABLE ROW LEVEL SECURITY;
+ALTER TABLE cluster_models ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,54 @@
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Upper bound on the similarity block held in memory at once (rows × papers)
+SIMILARITY_BLOCK_ELEMENTS = int(os.getenv("SIMILARITY_BLOCK_ELEMENTS", str(8 * 1024 * 1024)))
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """Unit-length float32 rows; zero rows stay zero."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def top_k_similarity_edges(
+    embeddings: np.ndarray,
+    k: int = 10,
+    groups: Optional[np.ndarray] = None,
+    min_similarity: Optional[float] = None,
+) -> List[Tuple[int, int, float]]:
+    """Undirected edges from each node to its k most similar neighbours.
+
+    Cosine similarities are computed one row block at a time, so the n×n matrix
+    is never materialized and the output has at most n·k edges. If `groups` is
+    given, only nodes in the same group are linked. Returns (i, j, similarity)
+    with i < j.
+    """
+    unit = normalize_rows(embeddings)
+    n_samples = len(unit)
+    k = min(k, n_samples - 1)
+    if k <= 0:
+        return []
+
+    block_size = max(1, SIMILARITY_BLOCK_ELEMENTS // n_samples)
+    edges = {}
+    for start in range(0, n_samples, block_size):
+        stop = min(start + block_size, n_samples)
+        block = unit[start:stop] @ unit.T
+        rows = np.arange(stop - start)
+        block[rows, rows + start] = -np.inf
+        if groups is not None:
+            block[groups[start:stop, None] != groups[None, :]] = -np.inf
+        if min_similarity is not None:
+            block[block < min_similarity] = -np.inf
+
+        neighbours = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        sims = np.take_along_axis(block, neighbours, axis=1)
+        for row, j, sim in zip(np.repeat(rows + start, k), neighbours.ravel(), sims.ravel()):
+            if sim == -np.inf:
+                continue
+            key = (row, j) if row < j else (j, row)
+            edges[key] = float(sim)
+
+    return [(int(i), int(j), sim) for (i, j), sim in sorted(edges.items())]
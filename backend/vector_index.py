@@ -0,0 +1,241 @@
+import os
+import asyncio
+import threading
+import importlib.util
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_storage import EMBEDDING_COLUMNS, embedding_matrix, has_embedding
+from similarity import normalize_rows
+from workers import run_cpu_bound
+
+# Projects whose similarity index is kept in memory; the least recently searched
+# one is dropped when another is loaded
+VECTOR_INDEX_MAX_PROJECTS = int(os.getenv("VECTOR_INDEX_MAX_PROJECTS", "32"))
+
+# Projects with at least this many embedded papers get an approximate HNSW index
+# when hnswlib is installed; smaller ones (and every project without hnswlib) are
+# searched exactly, which takes about 6 ms at 50k papers
+VECTOR_INDEX_HNSW_MIN_PAPERS = int(os.getenv("VECTOR_INDEX_HNSW_MIN_PAPERS", "100000"))
+
+# HNSW graph degree and search breadth: higher is better recall, slower search
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF = int(os.getenv("HNSW_EF", "200"))
+
+Neighbours = List[Tuple[str, float]]
+
+class ExactIndex:
+    """Unit-length float32 rows, searched with one matrix-vector product and a
+    partial sort. Rows live in a buffer that grows by doubling; removing a paper
+    moves the last row into its place."""
+    kind = "exact"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.matrix: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self.rows
+
+    def add(self, ids: List[str], vectors: np.ndarray):
+        """Add papers, replacing the vectors of any already indexed."""
+        unit = normalize_rows(vectors)
+        with self._lock:
+            if self.matrix is None:
+                self.matrix = np.empty((max(len(ids), 64), unit.shape[1]), dtype=np.float32)
+            targets = []
+            for paper_id in ids:
+                row = self.rows.get(paper_id)
+                if row is None:
+                    row = self.rows[paper_id] = len(self.ids)
+                    self.ids.append(paper_id)
+                targets.append(row)
+            if len(self.ids) > len(self.matrix):
+                grown = np.empty((max(len(self.ids), 2 * len(self.matrix)), self.matrix.shape[1]), dtype=np.float32)
+                grown[:len(self.matrix)] = self.matrix
+                self.matrix = grown
+            self.matrix[targets] = unit
+
+    def remove(self, ids: List[str]):
+        with self._lock:
+            for paper_id in ids:
+                row = self.rows.pop(paper_id, None)
+                if row is None:
+                    continue
+                last = len(self.ids) - 1
+                if row != last:
+                    moved = self.ids[last]
+                    self.ids[row] = moved
+                    self.rows[moved] = row
+                    self.matrix[row] = self.matrix[last]
+                self.ids.pop()
+
+    def search(self, paper_id: str, k: int) -> Optional[Neighbours]:
+        """The k papers most cosine-similar to `paper_id`, best first; None if it isn't indexed."""
+        with self._lock:
+            row = self.rows.get(paper_id)
+            if row is None:
+                return None
+            scores = self.matrix[:len(self.ids)] @ self.matrix[row]
+            scores[row] = -np.inf
+            k = min(k, len(self.ids) - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self.ids[i], float(scores[i])) for i in top]
+
+class HnswIndex:
+    """The same interface over an hnswlib graph (inner product on unit vectors).
+    Removed papers are marked deleted; replaced ones get a fresh label."""
+    kind = "hnsw"
+
+    def __init__(self, dim: int, capacity: int):
+        import hnswlib
+        self._lock = threading.Lock()
+        self._index = hnswlib.Index(space="ip", dim=dim)
+        self._index.init_index(max_elements=max(capacity, 1024), ef_construction=200, M=HNSW_M)
+        self._index.set_ef(HNSW_EF)
+        self.labels: Dict[str, int] = {}
+        self.ids: Dict[int, str] = {}
+        self._next_label = 0
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self.labels
+
+    def _remove(self, paper_id: str):
+        label = self.labels.pop(paper_id, None)
+        if label is not None:
+            self._index.mark_deleted(label)
+            del self.ids[label]
+
+    def add(self, ids: List[str], vectors: np.ndarray):
+        # A paper listed twice keeps its last vector, as in ExactIndex
+        last = {paper_id: i for i, paper_id in enumerate(ids)}
+        unit = normalize_rows(vectors)[list(last.values())]
+        with self._lock:
+            for paper_id in last:
+                self._remove(paper_id)
+            needed = self._next_label + len(last)
+            if needed > self._index.get_max_elements():
+                self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+            labels = np.arange(self._next_label, needed)
+            self._next_label = needed
+            self._index.add_items(unit, labels)
+            for paper_id, label in zip(last, labels.tolist()):
+                self.labels[paper_id] = label
+                self.ids[label] = paper_id
+
+    def remove(self, ids: List[str]):
+        with self._lock:
+            for paper_id in ids:
+                self._remove(paper_id)
+
+    def search(self, paper_id: str, k: int) -> Optional[Neighbours]:
+        with self._lock:
+            label = self.labels.get(paper_id)
+            if label is None:
+                return None
+            k = min(k + 1, len(self.labels))
+            if k <= 1:
+                return []
+            query = np.asarray(self._index.get_items([label]), dtype=np.float32)
+            labels, distances = self._index.knn_query(query, k=k)
+            return [(self.ids[int(found)], 1.0 - float(distance))
+                    for found, distance in zip(labels[0], distances[0]) if found != label][:k - 1]
+
+def hnsw_available() -> bool:
+    return importlib.util.find_spec("hnswlib") is not None
+
+def build_index(papers: List[dict]):
+    """An index of the papers with embeddings: HNSW for large projects when
+    hnswlib is installed, exact otherwise."""
+    papers = [paper for paper in papers if has_embedding(paper)]
+    if not papers:
+        return ExactIndex()
+    matrix = embedding_matrix(papers)
+    if len(papers) >= VECTOR_INDEX_HNSW_MIN_PAPERS and hnsw_available():
+        index = HnswIndex(matrix.shape[1], len(papers))
+    else:
+        index = ExactIndex()
+    index.add([paper['id'] for paper in papers], matrix)
+    return index
+
+# project id -> index, least recently used first
+_indexes: "OrderedDict[str, object]" = OrderedDict()
+# project id -> build in progress, and the updates made while it runs
+_builds: Dict[str, asyncio.Future] = {}
+_pending: Dict[str, list] = {}
+
+async def _load(supabase, project_id: str):
+    try:
+        response = await supabase.table("papers").select(
+            "id, " + ", ".join(EMBEDDING_COLUMNS)
+        ).eq("project_id", project_id).execute()
+        index = await run_cpu_bound(build_index, response.data)
+        # Papers uploaded or deleted while the select and build ran; applying them
+        # again is harmless when the select already saw them
+        dropped = False
+        for op, payload in _pending[project_id]:
+            if op == "add":
+                index.add([paper['id'] for paper in payload], embedding_matrix(payload))
+            elif op == "remove":
+                index.remove(payload)
+            else:
+                dropped = True
+        if not dropped:
+            _indexes[project_id] = index
+            while len(_indexes) > VECTOR_INDEX_MAX_PROJECTS:
+                _indexes.popitem(last=False)
+        print(f"✓ Built {index.kind} similarity index for project {project_id} ({len(index)} papers)")
+        return index
+    finally:
+        _builds.pop(project_id, None)
+        _pending.pop(project_id, None)
+
+async def get_project_index(supabase, project_id: str):
+    """The project's index, loaded on first use; concurrent first requests share one build."""
+    index = _indexes.get(project_id)
+    if index is not None:
+        _indexes.move_to_end(project_id)
+        return index
+    build = _builds.get(project_id)
+    if build is None:
+        # Updates are queued from now, before the load has run at all
+        _pending[project_id] = []
+        build = _builds[project_id] = asyncio.ensure_future(_load(supabase, project_id))
+    return await asyncio.shield(build)
+
+def index_papers(project_id: str, papers: List[dict]):
+    """Add new or re-embedded papers to the project's index, if it is loaded.
+    Projects that aren't loaded pick them up when they are."""
+    papers = [paper for paper in papers if has_embedding(paper)]
+    if not papers:
+        return
+    if project_id in _pending:
+        _pending[project_id].append(("add", papers))
+    index = _indexes.get(project_id)
+    if index is not None:
+        index.add([paper['id'] for paper in papers], embedding_matrix(papers))
+
+def unindex_papers(project_id: str, paper_ids: List[str]):
+    if project_id in _pending:
+        _pending[project_id].append(("remove", list(paper_ids)))
+    index = _indexes.get(project_id)
+    if index is not None:
+        index.remove(paper_ids)
+
+def drop_project_index(project_id: str):
+    if project_id in _pending:
+        _pending[project_id].append(("drop", None))
+    _indexes.pop(project_id, None)
@@ -0,0 +1,42 @@
+import os
+import asyncio
+import functools
+import threading
+from multiprocessing import get_context
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# CPU-bound work (PDF parsing, TF-IDF, KMeans, PCA) runs here so it never blocks
+# the event loop. numpy/scikit-learn release the GIL for the heavy parts.
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Worker processes for work that parallelizes across cores (the KMeans k-sweep)
+PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+_cpu_pool = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """Run a blocking function on the bounded CPU pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cpu_pool, functools.partial(func, *args, **kwargs))
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool, started on first use. Uses spawn so it is safe to
+    create from worker threads."""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS, mp_context=get_context("spawn"))
+    return _process_pool
+
+async def run_in_process(func, *args):
+    """Run a module-level function in the shared process pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+def shutdown_workers():
+    _cpu_pool.shutdown(wait=False, cancel_futures=True)
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
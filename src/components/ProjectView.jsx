@@ -179,7 +179,7 @@ function ProjectView() {
   };
 
   const getClusterName = (clusterId) => {
-    return clusterNames[clusterId] || clusterInfo?.cluster_summaries?.[clusterId] || `Cluster ${parseInt(clusterId) + 1}`;
+    return clusterNames[clusterId] || clusterInfo?.cluster_summaries?.[clusterId] || graphData?.clusters?.[clusterId]?.label || `Cluster ${parseInt(clusterId) + 1}`;
   };
 
   const papersByCluster = papers.reduce((acc, paper) => {
@@ -143,12 +143,33 @@ export const papersApi = {
   }
 };
 
+// How often a running clustering job is polled
+const CLUSTER_POLL_INTERVAL_MS = 2000;
+
 // Clustering API
 export const clusteringApi = {
-  cluster: async (projectId) => {
-    return apiRequest(`${API_URL}/api/cluster/${projectId}`, {
+  // Starts clustering as a background job and polls it, so no single request
+  // stays open long enough to hit a proxy timeout. Resolves with the same
+  // result the blocking call returned; onProgress gets the job's progress.
+  cluster: async (projectId, onProgress) => {
+    const started = await apiRequest(`${API_URL}/api/cluster/${projectId}?wait=false`, {
       method: 'POST'
     });
+    while (true) {
+      const job = await clusteringApi.getJob(started.job_id);
+      if (job.status === 'succeeded') {
+        return { ...job.result, job_id: job.id, coalesced: started.coalesced };
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Clustering failed');
+      }
+      if (onProgress) onProgress(job.progress);
+      await new Promise((resolve) => setTimeout(resolve, CLUSTER_POLL_INTERVAL_MS));
+    }
+  },
+
+  getJob: async (jobId) => {
+    return apiRequest(`${API_URL}/api/cluster/jobs/${jobId}`);
   },
 
   getGraph: async (projectId) => {